@@ -1,13 +1,14 @@
 import streamlit as st
-from resume_template import render_pdf
-from parser import parse_docx, parse_txt
-import json, yaml, os, io
+from instrument import Aggregator, recording
+from contextlib import nullcontext
+import yaml, os
+# ReportLab (resume_template, render_cache, preview, fonts) and the DOCX parser are imported
+# where they are first needed, so a cold session paints the form before loading them.
 
 st.set_page_config(page_title="Resume Builder", page_icon="🧰", layout="centered")
 
 # ---- Theme Sidebar ----
 st.sidebar.header("🎨 Theme")
-import yaml, os
 theme_file = "theme.yaml"
 if os.path.exists(theme_file):
     with open(theme_file, "r") as f:
@@ -40,19 +41,37 @@ with st.sidebar.expander("Sizes", expanded=False):
     body = st.number_input("Body size", value=float(theme.get("sizes",{}).get("body",10)))
     meta = st.number_input("Meta size", value=float(theme.get("sizes",{}).get("meta",9.5)))
     leading_adj = st.number_input("Leading adjust", value=float(theme.get("sizes",{}).get("leading_adjust",2)))
+    fit_one_page = st.checkbox("Auto-fit to one page", value=False)
+
+# Live theme from the sidebar; render_pdf compiles (and caches) it per call, so edits apply immediately.
+theme["page_size"] = ps
+theme["margins_in"] = {"left":ml, "right":mr, "top":mt, "bottom":mb}
+theme.setdefault("fonts",{}).update({
+    "prefer_ttf": prefer_ttf, "base": base, "bold": bold,
+    "ttf_regular": ttf_reg, "ttf_bold": ttf_bold
+})
+theme["colors"] = {"accent_hex":accent, "text_hex":textc, "muted_hex":muted}
+theme["sizes"] = {"h1":h1,"h2":h2,"body":body,"meta":meta,"leading_adjust":leading_adj}
+
+save_copy = st.sidebar.checkbox("Also save PDFs to output/", value=False)
+live_preview = st.sidebar.checkbox("Live preview", value=True)
+debug = st.sidebar.checkbox("Debug: record timings", value=False)
+timings = st.session_state.setdefault("timings", Aggregator())
+def timed():
+    return recording(timings) if debug else nullcontext()
 
 if st.sidebar.button("Save Theme"):
-    theme["page_size"] = ps
-    theme["margins_in"] = {"left":ml, "right":mr, "top":mt, "bottom":mb}
-    theme.setdefault("fonts",{}).update({
-        "prefer_ttf": prefer_ttf, "base": base, "bold": bold,
-        "ttf_regular": ttf_reg, "ttf_bold": ttf_bold
-    })
-    theme["colors"] = {"accent_hex":accent, "text_hex":textc, "muted_hex":muted}
-    theme["sizes"] = {"h1":h1,"h2":h2,"body":body,"meta":meta,"leading_adjust":leading_adj}
     with open(theme_file, "w") as f:
         yaml.safe_dump(theme, f, sort_keys=False)
-    st.sidebar.success("Theme saved. Regenerate a PDF to see changes.")
+    st.sidebar.success("Theme saved.")
+
+fitted = st.session_state.get("fitted_sizes")
+if fitted and st.sidebar.button(f"Save auto-fit sizes (scale {fitted['scale']})"):
+    theme["sizes"] = fitted["sizes"]
+    with open(theme_file, "w") as f:
+        yaml.safe_dump(theme, f, sort_keys=False)
+    del st.session_state["fitted_sizes"]
+    st.sidebar.success("Auto-fit sizes saved to theme.")
 
 st.title("🧰 Resume Builder & Transformer")
 
@@ -68,6 +87,59 @@ mode = st.radio("Choose a mode:", ["Create from Form", "Transform Existing"], ho
 def download_button(data_bytes: bytes, filename: str):
     st.download_button("⬇️ Download PDF", data=data_bytes, file_name=filename, mime="application/pdf")
 
+# Helper: render in memory through the render cache, optionally writing a copy under output/
+def generate(data: dict, name: str):
+    from resume_template import fit_theme, write_atomic
+    from render_cache import default_cache, render_key
+    from fonts import FontError
+    from schema import ValidationError
+    filename = f"{(name or 'resume').replace(' ', '_')}_resume.pdf"
+    out_path = os.path.join("output", filename) if save_copy else None
+    render_theme = theme
+    try:
+        if fit_one_page:
+            # fit_theme lays the resume out 3-10 times; reuse its answer while data and theme
+            # are unchanged, so a repeat press stays a render-cache hit.
+            key = render_key(data, theme)
+            last = st.session_state.get("last_fit")
+            if last and last[0] == key:
+                fit = last[1]
+            else:
+                with timed():
+                    fit = fit_theme(data, theme, pages=1)
+                st.session_state["last_fit"] = (key, fit)
+            render_theme = fit["theme"]
+            st.session_state["fitted_sizes"] = {"scale": fit["scale"], "sizes": fit["sizes"]}
+            st.info(f"Auto-fit scale {fit['scale']}: " + ", ".join(f"{k} {v}" for k, v in fit["sizes"].items())
+                    + ("" if fit["fits"] else " (still over one page at the smallest scale)"))
+        with timed():
+            pdf_bytes = default_cache().render(data, theme=render_theme)
+    except (FontError, ValidationError) as e:
+        st.error(str(e))
+        return
+    if out_path: write_atomic(out_path, pdf_bytes)
+    download_button(pdf_bytes, filename)
+    if out_path: st.success(f"Saved to {out_path}")
+
+# Helper: first-page preview; only sections whose data changed are rebuilt, and the fragment's
+# timer picks up edits that arrived inside the debounce window.
+@st.fragment(run_every=0.5)
+def show_preview(data: dict):
+    from preview import IncrementalRenderer
+    from fonts import FontError
+    from schema import ValidationError
+    previewer = st.session_state.setdefault("previewer", IncrementalRenderer())
+    try:
+        with timed():
+            png, fresh = previewer.preview(data, theme)
+    except ImportError:
+        st.warning("Install pypdfium2 to enable the live preview.")
+        return
+    except (FontError, ValidationError) as e:
+        st.error(str(e))
+        return
+    st.image(png, caption="Page 1" + ("" if fresh else " (updating…)"), use_column_width=True)
+
 # ---- Mode 1: Create from Form ----
 if mode == "Create from Form":
     st.subheader("Enter details")
@@ -121,14 +193,12 @@ if mode == "Create from Form":
         "certifications": [c.strip() for c in certs.split(",") if c.strip()]
     }
 
+    if live_preview:
+        st.markdown("### Preview")
+        show_preview(data)
+
     if st.button("Generate PDF"):
-        out_path = os.path.join("output", f"{name.replace(' ', '_')}_resume.pdf")
-        os.makedirs("output", exist_ok=True)
-        out_path = render_pdf(data, out_path=out_path)
-        with open(out_path, "rb") as f:
-            pdf_bytes = f.read()
-        download_button(pdf_bytes, os.path.basename(out_path))
-        st.success(f"Saved to {out_path}")
+        generate(data, name)
 
 # ---- Mode 2: Transform Existing ----
 else:
@@ -136,10 +206,14 @@ else:
     file = st.file_uploader("Upload a DOCX or TXT", type=["docx","txt"])
     if file is not None:
         parsed = {}
-        if file.name.lower().endswith(".docx"):
-            parsed = parse_docx(file.read())
-        else:
-            parsed = parse_txt(file.read())
+        from parser import parse
+        with timed():
+            parsed = parse(file.read(), "docx" if file.name.lower().endswith(".docx") else "txt")
+        conf = parsed.get("confidence", {})
+        if conf:
+            weak = [k for k, v in conf["fields"].items() if v < 0.5]
+            st.caption(f"Parse confidence {conf['overall']:.0%} ({conf['strategy']})"
+                       + (f"; check: {', '.join(weak)}" if weak else ""))
 
         st.markdown("### Parsed (edit before export)")
         name = st.text_input("Full Name", value=parsed.get("name",""))
@@ -168,13 +242,14 @@ else:
                     "bullets": [b.strip() for b in bullets.splitlines() if b.strip()]
                 })
 
-        # Education & certs (manual for now)
-        edu_degree = st.text_input("Degree", value="")
-        edu_school = st.text_input("School", value="")
-        edu_location = st.text_input("School Location", value="")
-        edu_dates = st.text_input("Dates", value="")
+        # Education (first parsed entry) & certs
+        edu_src = (parsed.get("education") or [{}])[0]
+        edu_degree = st.text_input("Degree", value=edu_src.get("degree",""))
+        edu_school = st.text_input("School", value=edu_src.get("school",""))
+        edu_location = st.text_input("School Location", value=edu_src.get("location",""))
+        edu_dates = st.text_input("Dates", value=edu_src.get("grad",""))
 
-        certs = st.text_input("Certifications (comma-separated)", value="")
+        certs = st.text_input("Certifications (comma-separated)", value=", ".join(parsed.get("certifications", [])))
 
         data = {
             "name": name,
@@ -190,14 +265,20 @@ else:
             "certifications": [c.strip() for c in certs.split(",") if c.strip()]
         }
 
+        if live_preview:
+            st.markdown("### Preview")
+            show_preview(data)
+
         if st.button("Generate PDF"):
-            name_for_file = (data.get("name") or "resume").replace(" ", "_")
-            out_path = os.path.join("output", f"{name_for_file}_resume.pdf")
-            os.makedirs("output", exist_ok=True)
-            out_path = render_pdf(data, out_path=out_path)
-            with open(out_path, "rb") as f:
-                pdf_bytes = f.read()
-            download_button(pdf_bytes, os.path.basename(out_path))
-            st.success(f"Saved to {out_path}")
+            generate(data, data.get("name"))
+
+if debug:
+    with st.sidebar.expander("🐞 Timings (s) / counts", expanded=True):
+        rows = [{"metric": k, **{c: round(v, 5) for c, v in r.items()}} for k, r in timings.summary().items()]
+        if rows: st.table(rows)
+        else: st.caption("Generate a PDF or upload a file to collect timings.")
+        from render_cache import default_cache
+        st.json(default_cache().stats())
+        if st.button("Reset timings"): timings.clear()
 
 st.caption("Tip: tweak fonts/margins/sections in resume_template.py to match your 10-year template.")
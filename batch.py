@@ -0,0 +1,113 @@
+import glob, json, os, time
+
+# ---------- INPUTS ----------
+def expand_inputs(specs, exts, manifest=None):
+    """Yield (path, rel) for every file named by paths, directories, globs or a manifest.
+    `rel` is the path relative to the directory (or a glob's non-wildcard prefix) it came from,
+    used to lay out outputs; a plain file path gives its basename."""
+    specs = list(specs)
+    if manifest:
+        with open(manifest, "r") as f:
+            specs.extend(l.strip() for l in f if l.strip() and not l.lstrip().startswith("#"))
+    seen = set()
+    for spec in specs:
+        for path, rel in _expand_one(spec, exts):
+            key = os.path.abspath(path)
+            if key in seen: continue
+            seen.add(key)
+            yield path, rel
+
+def _expand_one(spec, exts):
+    if os.path.isdir(spec):
+        for root, dirs, files in os.walk(spec):
+            dirs.sort()
+            for fn in sorted(files):
+                if fn.lower().endswith(exts):
+                    p = os.path.join(root, fn)
+                    yield p, os.path.relpath(p, spec)
+    elif os.path.isfile(spec):
+        yield spec, os.path.basename(spec)
+    elif glob.has_magic(spec):
+        root = _glob_root(spec)
+        for p in sorted(glob.iglob(spec, recursive=True)):
+            if os.path.isfile(p) and p.lower().endswith(exts):
+                yield p, os.path.relpath(p, root)
+    else:
+        raise FileNotFoundError(spec)
+
+def _glob_root(pattern):
+    """The directory a glob starts from: "c/**/*.yaml" -> "c", "*.yaml" -> "."."""
+    while glob.has_magic(pattern):
+        pattern = os.path.dirname(pattern)
+    return pattern or "."
+
+class Targets:
+    """Output paths claimed by the inputs of one run, so two inputs that map onto the same
+    output (same basename from two plain paths, ...) fail instead of overwriting each other."""
+    def __init__(self):
+        self._owners = {}
+
+    def claim(self, target, path):
+        """None when `path` owns `target`, else the input that claimed it first."""
+        owner = self._owners.setdefault(os.path.normcase(os.path.abspath(target)), path)
+        return None if owner == path else owner
+
+# ---------- POOL ----------
+def run_pool(fn, items, workers=None, initializer=None, initargs=(), max_inflight=None):
+    """Run fn(item) over items on a process pool, yielding (item, result, error) as each finishes.
+    Submission is windowed so huge input lists never sit in memory as futures."""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        if initializer: initializer(*initargs)
+        for item in items:
+            try:
+                yield item, fn(item), None
+            except Exception as e:
+                yield item, None, f"{type(e).__name__}: {e}"
+        return
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED  # ~30 ms; not needed for --help
+    max_inflight = max_inflight or workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        pending = {}
+        it = iter(items)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_inflight:
+                try:
+                    item = next(it)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[pool.submit(fn, item)] = item
+            if not pending: break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                item = pending.pop(fut)
+                try:
+                    yield item, fut.result(), None
+                except Exception as e:
+                    yield item, None, f"{type(e).__name__}: {e}"
+
+# ---------- REPORT ----------
+class Report:
+    """Per-file JSONL report plus running totals."""
+    def __init__(self, path=None):
+        self.ok = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self._f = open(path, "w") if path else None
+
+    def add(self, **row):
+        if row.get("status") == "ok": self.ok += 1
+        else: self.failed += 1
+        if self._f:
+            self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def close(self):
+        if self._f: self._f.close()
+
+    def summary(self):
+        secs = time.perf_counter() - self.started
+        total = self.ok + self.failed
+        rate = total / secs if secs > 0 else 0.0
+        return f"{self.ok} ok, {self.failed} failed in {secs:.1f}s ({rate:.1f} files/s)"
@@ -0,0 +1,185 @@
+import argparse, io, json, os, platform, random, statistics, subprocess, sys, time, tracemalloc
+
+SIZES = {
+    # name: (roles, bullets per role, education entries, skills)
+    "small": (2, 3, 1, 8),
+    "typical": (5, 5, 2, 20),
+    "pathological": (40, 15, 6, 60),
+}
+
+WORDS = ("integrated designed shipped owned API partner onboarding latency pipeline platform "
+         "reduced cost migrated customers analytics SQL Python workflow reliability team "
+         "launched automated support revenue dashboard service contract scale").split()
+
+# ---------- SYNTHETIC INPUTS ----------
+def _sentence(rnd, n):
+    return " ".join(rnd.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def synthetic_resume(size="typical", seed=0):
+    roles, bullets, edus, skills = SIZES[size]
+    rnd = random.Random(seed)
+    return {
+        "name": "Jordan Avery", "title": "Technical Integrations Specialist",
+        "email": "jordan.avery@email.com", "phone": "(555) 123-4567", "location": "Dallas, TX",
+        "links": ["linkedin.com/in/jordanavery", "github.com/jordanavery"],
+        "summary": " ".join(_sentence(rnd, 14) for _ in range(3)),
+        "skills": [f"{rnd.choice(WORDS).title()} {i}" for i in range(skills)],
+        "experience": [{
+            "company": f"Company {i}", "role": f"Engineer {i}", "dates": "Jan 2015 - Dec 2018",
+            "location": "Remote", "bullets": [_sentence(rnd, 22) for _ in range(bullets)],
+        } for i in range(roles)],
+        "education": [{"school": f"University {i}", "grad": "2015", "location": "Memphis, TN",
+                       "degree": "B.S. Information Systems"} for i in range(edus)],
+        "certifications": ["AWS Certified Cloud Practitioner"],
+    }
+
+def to_txt(data):
+    lines = [data["name"], f"{data['email']} | {data['phone']} | {data['location']}",
+             data["summary"], "Experience"]
+    for j in data["experience"]:
+        lines += [f"{j['role']} - {j['company']}", j["dates"]]
+        lines.extend(j["bullets"])
+    lines += ["Education"] + [e["school"] for e in data["education"]]
+    lines += ["Skills", ", ".join(data["skills"])]
+    return "\n".join(lines).encode("utf-8")
+
+def to_docx(data):
+    from docx import Document
+    doc = Document()
+    for line in to_txt(data).decode("utf-8").splitlines():
+        doc.add_paragraph(line)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+# ---------- STAGES ----------
+def stages(size):
+    """name -> (setup, fn): setup() builds fresh per-iteration input outside the timed region."""
+    from parser import parse_docx, parse_docx_thorough, parse_txt, parse_txt_thorough
+    from resume_template import build_story, compile_theme, make_doc, render_pdf_bytes
+    data = synthetic_resume(size)
+    txt, docx_bytes = to_txt(data), to_docx(data)
+    ct = compile_theme()
+    def _doc(): return make_doc(io.BytesIO(), data, theme=ct), build_story(data, ct)
+    return {
+        "parse_txt": (lambda: txt, parse_txt),
+        "parse_docx": (lambda: docx_bytes, parse_docx),
+        "parse_txt_thorough": (lambda: txt, parse_txt_thorough),
+        "parse_docx_thorough": (lambda: docx_bytes, parse_docx_thorough),
+        "story": (lambda: data, lambda d: build_story(d, ct)),
+        "build": (_doc, lambda ds: ds[0].build(ds[1])),
+        "render_total": (lambda: data, lambda d: render_pdf_bytes(d, theme=ct)),
+    }
+
+def measure(setup, fn, repeat):
+    fn(setup())  # warm-up
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        t0 = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - t0)
+    arg = setup()
+    tracemalloc.start()
+    fn(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    med = statistics.median(times)
+    return {"median_s": med, "min_s": min(times), "peak_kb": round(peak / 1024, 1),
+            "ops_per_s": round(1 / med, 2) if med else None}
+
+def run(sizes, repeat, only=None):
+    results = {}
+    for size in sizes:
+        for name, (setup, fn) in stages(size).items():
+            if only and name not in only: continue
+            key = f"{name}/{size}"
+            results[key] = measure(setup, fn, repeat)
+            r = results[key]
+            print(f"{key:28s} median {r['median_s']*1000:9.2f} ms  min {r['min_s']*1000:9.2f} ms  "
+                  f"peak {r['peak_kb']:9.1f} KiB  {r['ops_per_s']} ops/s")
+    return results
+
+# ---------- STARTUP ----------
+HERE = os.path.dirname(os.path.abspath(__file__))
+STARTUP = {
+    # name: (argv, counts against --startup-budget)
+    "cli_help": ([sys.executable, "generate_from_yaml.py", "--help"], True),
+    "ingest_help": ([sys.executable, "ingest.py", "--help"], True),
+    "import_parser": ([sys.executable, "-c", "import parser"], True),
+    "import_resume_template": ([sys.executable, "-c", "import resume_template"], False),
+    "first_render": ([sys.executable, "-c", "import resume_template as r, benchmark as b; "
+                      "r.render_pdf_bytes(b.synthetic_resume('small'))"], False),
+}
+
+def run_startup(repeat):
+    """Cold-process wall time of each entry point (new interpreter per run)."""
+    results = {}
+    for name, (argv, _) in STARTUP.items():
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            subprocess.run(argv, cwd=HERE, check=True, stdout=subprocess.DEVNULL)
+            times.append(time.perf_counter() - t0)
+        med = statistics.median(times)
+        results[f"startup/{name}"] = {"median_s": med, "min_s": min(times), "peak_kb": None,
+                                      "ops_per_s": round(1 / med, 2) if med else None}
+        print(f"{'startup/' + name:28s} median {med*1000:9.2f} ms  min {min(times)*1000:9.2f} ms")
+    return results
+
+def over_budget(results, budget):
+    return [(k, r["median_s"]) for k, r in results.items()
+            if k.startswith("startup/") and STARTUP[k[8:]][1] and r["median_s"] > budget]
+
+def compare(results, baseline, threshold):
+    """Stages whose median grew by more than `threshold` (0.2 = 20%) over the baseline."""
+    slow = []
+    for key, r in results.items():
+        b = baseline.get("results", {}).get(key)
+        if not b or not b.get("median_s"): continue
+        ratio = r["median_s"] / b["median_s"]
+        if ratio > 1 + threshold:
+            slow.append((key, b["median_s"], r["median_s"], ratio))
+    return slow
+
+def _meta():
+    import reportlab, docx
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "reportlab": reportlab.Version, "python_docx": getattr(docx, "__version__", "?")}
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark parse and render hot paths")
+    ap.add_argument("--sizes", default=",".join(SIZES), help=f"Comma list of {', '.join(SIZES)} (empty: skip)")
+    ap.add_argument("--stages", default=None, help="Comma list of stages to run (default: all)")
+    ap.add_argument("-n","--repeat", type=int, default=5, help="Timed iterations per stage (default: 5)")
+    ap.add_argument("--save", default=None, help="Write results as a JSON baseline")
+    ap.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown ratio before failing (default: 0.25)")
+    ap.add_argument("--startup", action="store_true", help="Also time cold starts of the entry points")
+    ap.add_argument("--startup-budget", type=float, default=None,
+                    help="Fail if a fast-start entry point (--help, parser import) takes longer, in seconds")
+    args = ap.parse_args()
+
+    only = set(args.stages.split(",")) if args.stages else None
+    results = run(args.sizes.split(","), args.repeat, only) if args.sizes else {}
+    if args.startup or args.startup_budget is not None:
+        results.update(run_startup(args.repeat))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"meta": _meta(), "results": results}, f, indent=2)
+        print(f"Wrote {args.save}")
+    if args.compare:
+        with open(args.compare, "r") as f:
+            slow = compare(results, json.load(f), args.threshold)
+        for key, old, new, ratio in slow:
+            print(f"REGRESSION {key}: {old*1000:.2f} ms -> {new*1000:.2f} ms ({(ratio-1)*100:+.0f}%)", file=sys.stderr)
+        if slow: sys.exit(1)
+        print(f"No stage slower than +{args.threshold*100:.0f}%")
+    if args.startup_budget is not None:
+        late = over_budget(results, args.startup_budget)
+        for key, secs in late:
+            print(f"OVER BUDGET {key}: {secs*1000:.0f} ms > {args.startup_budget*1000:.0f} ms", file=sys.stderr)
+        if late: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+import html, io, os, re, zipfile
+from xml.sax.saxutils import escape
+from schema import Resume, register_field, to_plain, validate
+
+# ---------- MODEL ----------
+# A resume laid out once, independent of the output format: the theme's section order and
+# labels are applied here, and every backend (pdf/html/docx/txt) only maps blocks to its own
+# primitives. Block text is passed through as written in the data.
+DEFAULT_SECTION_ORDER = ["header","summary","education","skills","experience","certifications"]
+DEFAULT_LABELS = {
+    "summary": "SUMMARY",
+    "skills": "SKILLS AND SOFTWARE PROFICIENCIES",
+    "experience": "RELEVANT EXPERIENCES",
+    "education": "EDUCATION",
+    "certifications": "CERTIFICATIONS",
+}
+
+class Block:
+    """One layout element. kind is one of:
+    name      text            the candidate's name
+    contact   items           location/email/phone/links on one line
+    heading   text            a section label
+    text      text, style     a paragraph; style is "body" or "meta"
+    inline    items, style    a list run together on one line; style is the separator,
+                              "bullet" or "comma"
+    bullets   items           a bulleted list
+    row       items           (left, right) on one line, right-aligned second cell
+    gap       size            vertical space in points"""
+    __slots__ = ("kind", "text", "items", "style", "size")
+    def __init__(self, kind, text="", items=(), style="body", size=0):
+        self.kind, self.text, self.items, self.style, self.size = kind, text, items, style, size
+
+    def __repr__(self):
+        return f"Block({self.kind!r}, {self.text or list(self.items) or self.size!r})"
+
+class Section:
+    __slots__ = ("name", "blocks")
+    def __init__(self, name, blocks):
+        self.name, self.blocks = name, blocks
+
+class Document:
+    """Laid-out sections plus what produced them: the validated resume, the theme as given
+    (dict, path, CompiledTheme or None) and its resolved dict, `spec`."""
+    __slots__ = ("title", "sections", "resume", "theme", "spec")
+    def __init__(self, title, sections, resume, theme, spec):
+        self.title, self.sections, self.resume, self.theme, self.spec = title, sections, resume, theme, spec
+
+    def blocks(self):
+        for s in self.sections:
+            yield from s.blocks
+
+# ---------- SECTIONS ----------
+def header_blocks(r, labels):
+    out = [Block("name", r.get("name", ""))]
+    bits = [b for b in (r.get("location", ""), r.get("email", ""), r.get("phone", "")) if b]
+    bits.extend(r.get("links", []))
+    if bits: out.append(Block("contact", items=bits))
+    out.append(Block("gap", size=6))
+    return out
+
+def summary_blocks(r, labels):
+    s = r.get("summary", "")
+    if not s: return []
+    return [Block("heading", labels["summary"]), Block("text", s)]
+
+def skills_blocks(r, labels):
+    skills = r.get("skills", [])
+    if not skills: return []
+    return [Block("heading", labels["skills"]), Block("inline", items=skills, style="bullet")]
+
+def experience_blocks(r, labels):
+    jobs = r.get("experience", [])
+    if not jobs: return []
+    out = [Block("heading", labels["experience"])]
+    for j in jobs:
+        org = j.get("company", "") or j.get("organization", "")
+        if org: out.append(Block("text", org))
+        if j.get("role", ""): out.append(Block("text", j.get("role")))
+        if j.get("dates", ""): out.append(Block("text", j.get("dates"), style="meta"))
+        if j.get("location", ""): out.append(Block("text", j.get("location"), style="meta"))
+        if j.get("bullets", []): out.append(Block("bullets", items=j.get("bullets")))
+    return out
+
+def education_blocks(r, labels):
+    edus = r.get("education", [])
+    if not edus: return []
+    out = [Block("heading", labels["education"])]
+    for e in edus:
+        grad = e.get("grad", "") or e.get("dates", "")
+        out.append(Block("row", items=(e.get("school", "") + (f", {grad}" if grad else ""), e.get("location", ""))))
+        if e.get("degree", ""): out.append(Block("text", e.get("degree")))
+        out.append(Block("gap", size=4))
+    return out
+
+def certifications_blocks(r, labels):
+    certs = r.get("certifications", [])
+    if not certs: return []
+    return [Block("heading", labels["certifications"]), Block("inline", items=certs, style="comma")]
+
+def _label(labels, name):
+    # labels may predate a later register_section(..., label=...); fall back to the registry.
+    return labels.get(name) or DEFAULT_LABELS.get(name) or name.upper()
+
+def entry_blocks(name, key=None):
+    """Builder for an "entries" section (schema.Entry items under `key`): title, subtitle,
+    dates/location, link, description and bullets, laid out like an experience entry."""
+    key = key or name
+    def build(r, labels):
+        out = [Block("heading", _label(labels, name))]
+        for e in r.get(key, []):
+            if e.get("title"):       out.append(Block("text", e.get("title")))
+            if e.get("subtitle"):    out.append(Block("text", e.get("subtitle")))
+            when = " | ".join(x for x in (e.get("dates"), e.get("location")) if x)
+            if when:                 out.append(Block("text", when, style="meta"))
+            if e.get("link"):        out.append(Block("text", e.get("link"), style="meta"))
+            if e.get("description"): out.append(Block("text", e.get("description")))
+            if e.get("bullets"):     out.append(Block("bullets", items=e.get("bullets")))
+        return out
+    build.__name__ = name + "_blocks"
+    return build
+
+def list_blocks(name, key=None, style="comma"):
+    """Builder for a "list" section: the heading plus the strings under `key` on one line."""
+    key = key or name
+    def build(r, labels):
+        return [Block("heading", _label(labels, name)), Block("inline", items=r.get(key, []), style=style)]
+    build.__name__ = name + "_blocks"
+    return build
+
+# ---------- REGISTRY ----------
+class SectionSpec:
+    """A registered section: build(resume, labels) -> [Block] and the data keys it reads.
+    Unless `always` is set, a section whose keys are all empty is skipped without calling build."""
+    __slots__ = ("name", "build", "keys", "always")
+    def __init__(self, name, build, keys, always=False):
+        self.name, self.build, self.keys, self.always = name, build, keys, always
+
+    def empty(self, r):
+        return not self.always and not any(r.get(k) for k in self.keys)
+
+SECTIONS = {}
+
+def register_section(name, build=None, keys=None, label=None, kind=None, always=False):
+    """Add (or replace) a section renderer; themes place it by listing `name` in section_order.
+
+    build(resume, labels) returns the section's blocks. Without build, kind picks a generic one:
+    "entries" (schema.Entry items) or "list" (strings on one line). Custom keys are always
+    validated with schema.register_field, as kind (default "list", for keys not registered
+    yet), so their errors are reported with the rest of the resume. label is the default
+    heading (theme labels override it). Returns build, or works as a decorator when build is
+    omitted and kind is None:
+
+        @register_section("awards", label="AWARDS")   # resume["awards"] validated as a list
+        def awards_blocks(r, labels): ...
+    """
+    keys = tuple(keys or (name,))
+    if label is not None: DEFAULT_LABELS[name] = label
+    def add(fn):
+        SECTIONS[name] = SectionSpec(name, fn, keys, always)
+        return fn
+    for k in keys:
+        if k not in Resume._known and (kind is not None or k not in Resume.EXTRA_FIELDS):
+            register_field(k, kind or "list")
+    if build is None and kind is not None:
+        build = (list_blocks if kind == "list" else entry_blocks)(name, keys[0])
+    return add if build is None else add(build)
+
+register_section("header",         header_blocks,         ("name","email","phone","location","links"), always=True)
+register_section("summary",        summary_blocks)
+register_section("education",      education_blocks)
+register_section("skills",         skills_blocks)
+register_section("experience",     experience_blocks)
+register_section("certifications", certifications_blocks)
+register_section("projects",       kind="entries", label="PROJECTS")
+register_section("publications",   kind="entries", label="PUBLICATIONS")
+
+def pipeline(theme=None):
+    """The registered sections a theme lays out, in its section_order (unknown names skipped)."""
+    return [SECTIONS[n] for n in section_order(theme) if n in SECTIONS]
+
+def section_values(spec, r):
+    """The slice of a resume one section reads, as plain data (for cache keys)."""
+    return [to_plain(r.get(k)) for k in spec.keys]
+
+# The process-wide default theme: theme.yaml read once, on first use. resume_template compiles
+# its default theme from this same dict, so the two can never disagree.
+_DEFAULT = {}
+
+def load_theme(path="theme.yaml"):
+    """Theme dict from a YAML file ({} when the file is missing or empty)."""
+    if not os.path.exists(path): return {}
+    from schema import load_yaml
+    return load_yaml(path) or {}
+
+def default_theme_dict():
+    if "theme" not in _DEFAULT: _DEFAULT["theme"] = load_theme()
+    return _DEFAULT["theme"]
+
+def _theme_dict(theme):
+    if hasattr(theme, "theme"): return theme.theme  # a resume_template.CompiledTheme
+    if theme is None: return default_theme_dict()
+    if isinstance(theme, str): return load_theme(theme)
+    return theme
+
+def section_order(theme):
+    return _theme_dict(theme).get("section_order") or DEFAULT_SECTION_ORDER
+
+def labels_for(theme):
+    return {**DEFAULT_LABELS, **(_theme_dict(theme).get("labels") or {})}
+
+def build_document(data, theme=None):
+    """Document for one resume: the theme's pipeline, minus sections with no data."""
+    r = validate(data)
+    t = _theme_dict(theme)
+    labels = labels_for(t)
+    sections = [Section(spec.name, spec.build(r, labels)) for spec in pipeline(t) if not spec.empty(r)]
+    return Document(r.get("name", "") or "Resume", sections, r, theme, t)
+
+# ---------- BACKENDS ----------
+def to_text(doc):
+    """Plain UTF-8 text with no markup, for ATS uploads."""
+    lines = []
+    for b in doc.blocks():
+        k = b.kind
+        if   k == "name":     lines.append(b.text)
+        elif k == "contact":  lines.append(" | ".join(b.items))
+        elif k == "heading":  lines += ["", b.text.upper()]
+        elif k == "text":     lines.append(b.text)
+        elif k == "inline":   lines.append((", " if b.style == "comma" else " | ").join(b.items))
+        elif k == "bullets":  lines.extend(f"- {i}" for i in b.items)
+        elif k == "row":      lines.append(" | ".join(x for x in b.items if x))
+    return ("\n".join(lines).strip() + "\n").encode("utf-8")
+
+_HTML_CSS = """body{{font-family:{font},Helvetica,Arial,sans-serif;color:{text};max-width:7.1in;margin:0.7in auto;font-size:{body}pt}}
+h1{{color:{accent};font-size:{h1}pt;margin:0 0 6pt}}h2{{color:{accent};font-size:{h2}pt;margin:10pt 0 4pt}}
+p{{margin:0}}.meta{{color:{muted};font-size:{meta}pt}}.row{{display:flex;justify-content:space-between}}
+ul{{margin:0;padding-left:18pt}}"""
+
+def to_html(doc):
+    """Self-contained HTML page styled from the theme's colors and sizes."""
+    t = doc.spec
+    c, s = t.get("colors") or {}, t.get("sizes") or {}
+    css = _HTML_CSS.format(font=(t.get("fonts") or {}).get("base", "Helvetica"),
+                           text=c.get("text_hex", "#000000"), accent=c.get("accent_hex", "#000000"),
+                           muted=c.get("muted_hex", "#444444"), body=s.get("body", 10.5),
+                           h1=s.get("h1", 18), h2=s.get("h2", 12), meta=s.get("meta", 9.5))
+    e = html.escape
+    out = [f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{e(doc.title)}</title>"
+           f"<style>{css}</style></head><body>"]
+    for b in doc.blocks():
+        k = b.kind
+        if   k == "name":    out.append(f"<h1>{e(b.text)}</h1>")
+        elif k == "contact": out.append(f"<p class=\"meta\">{' &#8226; '.join(e(i) for i in b.items)}</p>")
+        elif k == "heading": out.append(f"<h2>{e(b.text)}</h2>")
+        elif k == "text":    out.append(f"<p class=\"{b.style}\">{e(b.text)}</p>")
+        elif k == "inline":
+            sep = ", " if b.style == "comma" else " &#8226; "
+            out.append(f"<p>{sep.join(e(i) for i in b.items)}</p>")
+        elif k == "bullets": out.append("<ul>" + "".join(f"<li>{e(i)}</li>" for i in b.items) + "</ul>")
+        elif k == "row":     out.append(f"<div class=\"row\"><p>{e(b.items[0])}</p><p class=\"meta\">{e(b.items[1])}</p></div>")
+        elif k == "gap":     out.append(f"<div style=\"height:{b.size}pt\"></div>")
+    out.append("</body></html>")
+    return "\n".join(out).encode("utf-8")
+
+_DOCX = {}
+_XML_BAD = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+def _docx_template():
+    """python-docx's default.docx (styles, numbering, ...) minus its document.xml, zipped once."""
+    t = _DOCX.get("template")
+    if t is None:
+        import docx
+        src = os.path.join(os.path.dirname(docx.__file__), "templates", "default.docx")
+        buf = io.BytesIO()
+        with zipfile.ZipFile(src) as zin, zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zout:
+            for info in zin.infolist():
+                if info.filename != "word/document.xml":
+                    zout.writestr(info.filename, zin.read(info))
+        t = _DOCX["template"] = buf.getvalue()
+    return t
+
+def _wp(runs="", style=None, after=0, before=None, tab=None):
+    ppr = f'<w:pStyle w:val="{style}"/>' if style else ""
+    if tab: ppr += f'<w:tabs><w:tab w:val="right" w:pos="{tab}"/></w:tabs>'
+    ppr += f'<w:spacing w:after="{after}"' + (f' w:before="{before}"' if before is not None else "") + "/>"
+    return f"<w:p><w:pPr>{ppr}</w:pPr>{runs}</w:p>"
+
+def _wr(text, rpr=""):
+    return f'<w:r><w:rPr>{rpr}</w:rPr><w:t xml:space="preserve">{_xml(text)}</w:t></w:r>' if text else ""
+
+def _xml(s):
+    return escape(_XML_BAD.sub("", s))
+
+def to_docx(doc):
+    """Word document using the built-in Title/Heading 1/List Bullet styles, which ATS parsers read.
+    Written straight to WordprocessingML on top of a cached template: python-docx's object
+    model spends most of its time on style lookups and re-zipping the 400 KB styles part."""
+    t = doc.spec
+    s, c, f = t.get("sizes") or {}, t.get("colors") or {}, t.get("fonts") or {}
+    font = _xml(f.get("base", "Helvetica")).replace('"', "&quot;")
+    fonts = f'<w:rFonts w:ascii="{font}" w:hAnsi="{font}" w:cs="{font}"/>'
+    body = fonts + f'<w:sz w:val="{round(s.get("body", 10.5) * 2)}"/>'
+    meta = fonts + f'<w:color w:val="{c.get("muted_hex", "#444444").lstrip("#")}"/><w:sz w:val="{round(s.get("meta", 9.5) * 2)}"/>'
+    page = (t.get("page_size") or "LETTER").upper()
+    w, h = (11906, 16838) if page == "A4" else (12240, 15840)
+    m = {k: round(float((t.get("margins_in") or {}).get(k, 0.7)) * 1440) for k in ("left", "right", "top", "bottom")}
+    out = []
+    for b in doc.blocks():
+        k = b.kind
+        if   k == "name":    out.append(_wp(_wr(b.text), "Title", after=120))
+        elif k == "contact": out.append(_wp(_wr(" \u2022 ".join(b.items), meta)))
+        elif k == "heading": out.append(_wp(_wr(b.text), "Heading1", after=80, before=200))
+        elif k == "text":    out.append(_wp(_wr(b.text, meta if b.style == "meta" else body)))
+        elif k == "inline":  out.append(_wp(_wr((", " if b.style == "comma" else " \u2022 ").join(b.items), body)))
+        elif k == "bullets": out.extend(_wp(_wr(i, body), "ListBullet") for i in b.items)
+        elif k == "row":
+            left, right = b.items
+            runs = _wr(left, body) + ("<w:r><w:tab/></w:r>" + _wr(right, meta) if right else "")
+            out.append(_wp(runs, tab=w - m["left"] - m["right"]))
+        elif k == "gap":     out.append(_wp(after=b.size * 20))
+    xml = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<w:document xmlns:w="{_W}"><w:body>'
+           + "".join(out)
+           + f'<w:sectPr><w:pgSz w:w="{w}" w:h="{h}"/><w:pgMar w:top="{m["top"]}" w:right="{m["right"]}" '
+             f'w:bottom="{m["bottom"]}" w:left="{m["left"]}" w:header="720" w:footer="720" w:gutter="0"/></w:sectPr>'
+           + "</w:body></w:document>")
+    buf = io.BytesIO(_docx_template())
+    with zipfile.ZipFile(buf, "a", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("word/document.xml", xml)
+    return buf.getvalue()
+
+def to_pdf(doc):
+    from resume_template import render_pdf_bytes
+    return render_pdf_bytes(doc, theme=doc.theme)
+
+# format -> (renderer(Document) -> bytes, file extension)
+BACKENDS = {
+    "pdf":  (to_pdf,  ".pdf"),
+    "html": (to_html, ".html"),
+    "docx": (to_docx, ".docx"),
+    "txt":  (to_text, ".txt"),
+}
+
+def render(doc, fmt):
+    if fmt not in BACKENDS:
+        raise ValueError(f"unknown format {fmt!r}; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[fmt][0](doc)
+
+def render_formats(data, formats, theme=None):
+    """{format: bytes} for one resume, laid out once and rendered by each backend."""
+    doc = build_document(data, theme)
+    return {fmt: render(doc, fmt) for fmt in formats}
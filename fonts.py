@@ -0,0 +1,64 @@
+import mmap, os, hashlib, threading
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+class FontError(Exception):
+    """A font configured in the theme is missing or cannot be parsed."""
+
+class _MappedFile:
+    """File-like handing TTFont the read-only memory map instead of a private bytes copy,
+    so every process that maps the same file shares its pages through the OS page cache."""
+    def __init__(self, path):
+        self.name = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    def read(self):
+        return self._mm
+
+class FontStore:
+    """Process-wide registry of TTF files: each path is mapped and parsed once, then
+    registered with ReportLab under a stable name. Populate it before forking a worker pool
+    (see preload) and the workers inherit the parsed metrics copy-on-write. ReportLab embeds
+    TTFs as per-document glyph subsets, so only the glyphs actually used reach the PDF."""
+    def __init__(self):
+        self._names = {}  # abs path -> registered font name
+        self._lock = threading.Lock()
+
+    def name_for(self, path):
+        return "Tpl-" + hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:12]
+
+    def register(self, path):
+        key = os.path.abspath(path)
+        with self._lock:
+            name = self._names.get(key)
+            if name is not None: return name
+            if not os.path.isfile(key):
+                raise FontError(f"font file not found: {path}")
+            name = self.name_for(key)
+            try:
+                pdfmetrics.registerFont(TTFont(name, _MappedFile(key)))
+            except Exception as e:
+                raise FontError(f"cannot load font {path}: {type(e).__name__}: {e}") from e
+            self._names[key] = name
+            return name
+
+    def resolve(self, fonts):
+        """(regular, bold) font names for a theme's `fonts` block. With prefer_ttf set, both
+        TTF files must load; a missing or broken file raises FontError instead of silently
+        falling back to the built-in fonts."""
+        base = fonts.get("base", "Helvetica")
+        bold = fonts.get("bold", "Helvetica-Bold")
+        if not fonts.get("prefer_ttf", False):
+            return base, bold
+        return (self.register(fonts.get("ttf_regular", "Inter-Regular.ttf")),
+                self.register(fonts.get("ttf_bold", "Inter-Bold.ttf")))
+
+    def registered(self):
+        with self._lock: return dict(self._names)
+
+STORE = FontStore()
+
+def preload(*themes):
+    """Parse every TTF the given theme dicts use, in this (parent) process."""
+    for theme in themes:
+        STORE.resolve((theme or {}).get("fonts", {}))
@@ -1,20 +1,157 @@
-import argparse, yaml, os
-from resume_template import render_pdf
+import argparse, os, sys, time
+from batch import expand_inputs, run_pool, Report, Targets
 
-def main():
-    ap = argparse.ArgumentParser(description="Generate resume PDF from YAML data")
-    ap.add_argument("yaml_path", help="Path to YAML file with resume fields")
-    ap.add_argument("-o","--out", default=None, help="Output PDF path (default: ./output/<name>_resume.pdf)")
-    args = ap.parse_args()
+YAML_EXTS = (".yaml", ".yml")
+
+_SECTIONS = None  # per-worker resume_template.SectionCache
+
+def _init_worker():
+    # Compile the default theme (fonts, styles) once per worker so every file it renders finds
+    # it warm. Under fork this is already done: render_batch compiles it before the pool starts.
+    global _SECTIONS
+    from resume_template import SectionCache, default_theme
+    default_theme()
+    # Files from one source often repeat whole sections (education, certifications, skills);
+    # a miss costs ~0.3 ms of hashing and pickling against ~30 ms per render.
+    _SECTIONS = SectionCache(max_sections=1024)
+
+def write_formats(data, stem, formats):
+    """Write stem + ext for each format, from one validation and one docmodel layout pass."""
+    from docmodel import BACKENDS, build_document, render
+    from resume_template import write_atomic
+    doc = build_document(data)
+    return [write_atomic(stem + BACKENDS[fmt][1], render(doc, fmt)) for fmt in formats]
+
+def _render_one(job):
+    from schema import load_yaml
+    path, stem, formats = job
+    t0 = time.perf_counter()
+    data = load_yaml(path) or {}
+    if formats == ("pdf",):
+        from resume_template import render_pdf
+        outs = [render_pdf(data, out_path=stem + ".pdf", cache=_SECTIONS)]
+    else:
+        outs = write_formats(data, stem, formats)
+    return {"output": outs[0] if len(outs) == 1 else outs, "seconds": round(time.perf_counter() - t0, 4)}
+
+def _validate_chunk(paths):
+    # Files travel in chunks: with ~1 ms of work per file, per-file pool round trips would dominate.
+    from schema import check, load_yaml
+    out = []
+    for path in paths:
+        try:
+            errors = check(load_yaml(path))[1]
+        except Exception as e:
+            errors = [("<file>", f"{type(e).__name__}: {e}")]
+        out.append((path, errors))
+    return out
 
-    with open(args.yaml_path, "r") as f:
-        data = yaml.safe_load(f)
+def _chunks(it, n):
+    chunk = []
+    for x in it:
+        chunk.append(x)
+        if len(chunk) == n:
+            yield chunk
+            chunk = []
+    if chunk: yield chunk
 
+def validate_batch(inputs, manifest=None, workers=None, report_path=None, chunk=256):
+    """Schema-check every input without rendering; nothing heavier than yaml is imported."""
+    paths = (p for p, _ in expand_inputs(inputs, YAML_EXTS, manifest))
+    report = Report(report_path)
+    try:
+        for _, res, err in run_pool(_validate_chunk, _chunks(paths, chunk), workers):
+            if err:  # the whole chunk failed (e.g. a worker died)
+                report.add(status="error", error=err)
+                print(f"FAILED chunk: {err}", file=sys.stderr)
+                continue
+            for path, errors in res:
+                if not errors:
+                    report.add(input=path, status="ok")
+                    continue
+                report.add(input=path, status="invalid", errors=[f"{p}: {m}" for p, m in errors])
+                for p, m in errors: print(f"{path}: {p}: {m}", file=sys.stderr)
+    finally:
+        report.close()
+    print(report.summary())
+    return report
+
+def render_single(yaml_path, out=None, formats=("pdf",)):
+    from schema import load_yaml, validate
+    data = validate(load_yaml(yaml_path))
     name = (data.get("name") or "resume").replace(" ","_")
-    out = args.out or os.path.join("output", f"{name}_resume.pdf")
-    os.makedirs(os.path.dirname(out), exist_ok=True)
-    render_pdf(data, out_path=out)
-    print(f"Wrote {out}")
+    out = out or os.path.join("output", f"{name}_resume.{formats[0]}")
+    if formats == ("pdf",):
+        from resume_template import render_pdf
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        outs = [render_pdf(data, out_path=out)]
+    else:
+        outs = write_formats(data, os.path.splitext(out)[0], formats)
+    for o in outs: print(f"Wrote {o}")
+
+def render_batch(inputs, out_dir="output", manifest=None, workers=None, report_path=None, formats=("pdf",)):
+    # Importing resume_template no longer loads the theme; compile it (and parse its fonts) here
+    # so forked workers share it instead of each parsing the TTFs on its first render.
+    from resume_template import default_theme
+    default_theme()
+    report = Report(report_path)
+    targets = Targets()
+    def jobs():
+        for p, rel in expand_inputs(inputs, YAML_EXTS, manifest):
+            stem = os.path.join(out_dir, os.path.splitext(rel)[0])
+            owner = targets.claim(stem, p)
+            if owner is None:
+                yield p, stem, formats
+                continue
+            err = f"output {stem} is already used by {owner}"
+            report.add(input=p, output=stem, status="error", error=err)
+            print(f"FAILED {p}: {err}", file=sys.stderr)
+    try:
+        for (path, stem, _), res, err in run_pool(_render_one, jobs(), workers, initializer=_init_worker):
+            if err: report.add(input=path, output=stem, status="error", error=err)
+            else:   report.add(input=path, status="ok", **res)
+            if err: print(f"FAILED {path}: {err}", file=sys.stderr)
+    finally:
+        report.close()
+    print(report.summary())
+    return report
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate resume PDF(s) from YAML data")
+    ap.add_argument("inputs", nargs="*", help="YAML file(s), directories or glob patterns")
+    ap.add_argument("-o","--out", default=None, help="Output path for a single input (default: ./output/<name>_resume.<format>)")
+    ap.add_argument("--out-dir", default="output", help="Output directory for batch mode (default: ./output)")
+    ap.add_argument("-m","--manifest", default=None, help="Text file listing one input path/dir/glob per line")
+    ap.add_argument("-j","--workers", type=int, default=None, help="Worker processes for batch mode (default: CPU count)")
+    ap.add_argument("--report", default=None, help="Write a per-file JSONL success/failure report")
+    ap.add_argument("-f","--format", default="pdf",
+                    help="Comma list of output formats: pdf, html, docx, txt (default: pdf)")
+    ap.add_argument("--validate-only", action="store_true", help="Check inputs against the schema without rendering")
+    args = ap.parse_args()
+    if not args.inputs and not args.manifest:
+        ap.error("give at least one YAML path, directory, glob or --manifest")
+    formats = tuple(dict.fromkeys(f.strip().lower() for f in args.format.split(",") if f.strip()))
+    from docmodel import BACKENDS
+    bad = [f for f in formats if f not in BACKENDS]
+    if bad or not formats:
+        ap.error(f"unknown format(s) {', '.join(bad) or '(none)'}; choose from {', '.join(BACKENDS)}")
+    if args.validate_only:
+        report = validate_batch(args.inputs, args.manifest, args.workers, args.report)
+        sys.exit(1 if report.failed else 0)
+
+    single = len(args.inputs) == 1 and not args.manifest and os.path.isfile(args.inputs[0])
+    if single and not args.report:
+        from schema import ValidationError
+        try:
+            render_single(args.inputs[0], args.out, formats)
+        except ValidationError as e:
+            for p, m in e.errors: print(f"{args.inputs[0]}: {p}: {m}", file=sys.stderr)
+            sys.exit(1)
+        return
+    if args.out:
+        ap.error("-o/--out only applies to a single input; use --out-dir for batches")
+    report = render_batch(args.inputs, args.out_dir, args.manifest, args.workers, args.report, formats)
+    sys.exit(1 if report.failed else 0)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,173 @@
+import argparse, json, os, sys, time
+from batch import expand_inputs, run_pool, Report, Targets
+
+RESUME_EXTS = (".docx", ".txt")
+
+# ---------- NORMALIZE ----------
+def to_schema(parsed):
+    """Map parser output onto the sample_input.yaml schema (key order included)."""
+    def _s(v): return (v or "").strip() if isinstance(v, str) else ""
+    return {
+        "name": _s(parsed.get("name")),
+        "title": _s(parsed.get("title")),
+        "email": _s(parsed.get("email")),
+        "phone": _s(parsed.get("phone")),
+        "location": _s(parsed.get("location")),
+        "links": [l for l in parsed.get("links", []) if l],
+        "summary": _s(parsed.get("summary")),
+        "education": [{
+            "school": _s(e.get("school")),
+            "grad": _s(e.get("grad") or e.get("dates")),
+            "location": _s(e.get("location")),
+            "degree": _s(e.get("degree")),
+        } for e in parsed.get("education", [])],
+        "skills": [s for s in parsed.get("skills", []) if s],
+        "experience": [{
+            "company": _s(j.get("company") or j.get("organization")),
+            "role": _s(j.get("role")),
+            "dates": _s(j.get("dates")),
+            "location": _s(j.get("location")),
+            "bullets": [b for b in j.get("bullets", []) if b],
+        } for j in parsed.get("experience", [])],
+        "certifications": [c for c in parsed.get("certifications", []) if c],
+    }
+
+# ---------- WORKER ----------
+_CLASSIFIER = None
+_MIN_CONFIDENCE = None
+
+def _init_worker(headings=None, min_confidence=None):
+    global _CLASSIFIER, _MIN_CONFIDENCE
+    import parser  # noqa: F401
+    _MIN_CONFIDENCE = min_confidence
+    if headings:
+        from sections import SectionClassifier
+        _CLASSIFIER = SectionClassifier(headings)
+
+def parse_file(path, min_confidence=None):
+    """(schema dict, confidence) for one file. Fast parses scoring below min_confidence are
+    re-parsed with the thorough strategies in the same worker, so only that tail pays for them."""
+    from parser import MIN_CONFIDENCE, parse
+    with open(path, "rb") as f:
+        raw = f.read()
+    kind = "docx" if path.lower().endswith(".docx") else "txt"
+    floor = MIN_CONFIDENCE if min_confidence is None else min_confidence
+    parsed = parse(raw, kind, _CLASSIFIER, floor)
+    return to_schema(parsed), parsed["confidence"]
+
+def _ingest_one(job):
+    path, out = job
+    t0 = time.perf_counter()
+    data, conf = parse_file(path, _MIN_CONFIDENCE)
+    if out:  # YAML mode: the worker writes its own file
+        import yaml
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w") as f:
+            yaml.safe_dump(data, f, sort_keys=False, allow_unicode=True)
+        data = None
+    return {"data": data, "confidence": conf, "seconds": round(time.perf_counter() - t0, 4)}
+
+# ---------- CHECKPOINT ----------
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def load_checkpoint(path):
+    """input path -> (size, mtime_ns) for every file already ingested successfully."""
+    done = {}
+    if path and os.path.exists(path):
+        with open(path, "r") as f:
+            for line in f:
+                try: row = json.loads(line)
+                except ValueError: continue  # torn last line from an interrupted run
+                if row.get("status") == "ok": done[row["input"]] = (row["size"], row["mtime_ns"])
+                else: done.pop(row.get("input"), None)
+    return done
+
+def ingest(inputs, out, fmt="yaml", manifest=None, workers=None, checkpoint=None, report_path=None, headings=None,
+           min_confidence=None):
+    done = load_checkpoint(checkpoint)
+    targets = Targets()
+    def jobs():
+        for path, rel in expand_inputs(inputs, RESUME_EXTS, manifest):
+            target = os.path.join(out, os.path.splitext(rel)[0] + ".yaml") if fmt == "yaml" else None
+            # Claimed before the checkpoint skip, so a file done last run still owns its output.
+            owner = target and targets.claim(target, path)
+            if owner:
+                err = f"output {target} is already used by {owner}"
+                size, mtime_ns = _stamp(path)
+                record({"input": path, "size": size, "mtime_ns": mtime_ns, "status": "error", "error": err})
+                print(f"FAILED {path}: {err}", file=sys.stderr)
+                continue
+            if done.get(path) == _stamp(path): continue
+            yield path, target
+    ckpt = open(checkpoint, "a") if checkpoint else None
+    sink = open(out, "a", encoding="utf-8") if fmt == "jsonl" else None
+    from parser import MIN_CONFIDENCE, low_confidence
+    floor = MIN_CONFIDENCE if min_confidence is None else min_confidence
+    report = Report(report_path)
+    def record(row):
+        report.add(**row)
+        if ckpt:
+            ckpt.write(json.dumps(row, ensure_ascii=False) + "\n")
+            ckpt.flush()
+    low = thorough = 0
+    try:
+        for (path, target), res, err in run_pool(_ingest_one, jobs(), workers, initializer=_init_worker,
+                                                 initargs=(headings, min_confidence)):
+            size, mtime_ns = _stamp(path)
+            row = {"input": path, "size": size, "mtime_ns": mtime_ns}
+            if err:
+                row.update(status="error", error=err)
+                print(f"FAILED {path}: {err}", file=sys.stderr)
+            else:
+                conf = res["confidence"]
+                if sink:
+                    sink.write(json.dumps({"source": path, "data": res["data"], "confidence": conf}, ensure_ascii=False) + "\n")
+                    sink.flush()
+                row.update(status="ok", output=target or out, seconds=res["seconds"],
+                           confidence=conf["overall"], strategy=conf["strategy"], fields=conf["fields"])
+                thorough += conf["strategy"] == "thorough"
+                if low_confidence(conf, floor): low += 1
+            record(row)
+    finally:
+        report.close()
+        if ckpt: ckpt.close()
+        if sink: sink.close()
+    print(report.summary() + (f" ({len(done)} skipped from checkpoint)" if done else "")
+          + f"; {thorough} re-parsed thoroughly, {low} still below confidence")
+    return report
+
+def main():
+    ap = argparse.ArgumentParser(description="Bulk-convert DOCX/TXT resumes into YAML (sample_input.yaml schema) or JSONL")
+    ap.add_argument("inputs", nargs="*", help="Resume files, directories or glob patterns")
+    ap.add_argument("-o","--out", default="ingested", help="Output directory (yaml) or file (jsonl); default: ./ingested")
+    ap.add_argument("-f","--format", choices=["yaml","jsonl"], default="yaml")
+    ap.add_argument("-m","--manifest", default=None, help="Text file listing one input path/dir/glob per line")
+    ap.add_argument("-j","--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    ap.add_argument("--checkpoint", default=None,
+                    help="Resumable JSONL checkpoint; files already ingested unchanged are skipped "
+                         "(default: <out>/.checkpoint.jsonl for yaml, <out>.checkpoint.jsonl for jsonl)")
+    ap.add_argument("--report", default=None, help="Write a per-file JSONL report for this run")
+    ap.add_argument("--headings", default=None, help="YAML mapping of section -> extra heading synonyms")
+    ap.add_argument("--min-confidence", type=float, default=None,
+                    help="Re-parse files whose fast-parse confidence (0-1) is below this with the slower "
+                         "style/regex strategies (default: 0.6; 0 disables re-parsing)")
+    args = ap.parse_args()
+    if not args.inputs and not args.manifest:
+        ap.error("give at least one resume path, directory, glob or --manifest")
+    if args.format == "jsonl" and args.out == "ingested": args.out = "ingested.jsonl"
+    checkpoint = args.checkpoint or (os.path.join(args.out, ".checkpoint.jsonl") if args.format == "yaml"
+                                     else args.out + ".checkpoint.jsonl")
+    os.makedirs(os.path.dirname(os.path.abspath(checkpoint)), exist_ok=True)
+    headings = None
+    if args.headings:
+        import yaml
+        with open(args.headings, "r") as f:
+            headings = yaml.safe_load(f) or {}
+    report = ingest(args.inputs, args.out, args.format, args.manifest, args.workers, checkpoint, args.report, headings,
+                    args.min_confidence)
+    sys.exit(1 if report.failed else 0)
+
+if __name__ == "__main__":
+    main()
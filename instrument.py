@@ -0,0 +1,85 @@
+import contextlib, contextvars, threading, time
+from collections import deque
+
+# ---------- AGGREGATION ----------
+class Aggregator:
+    """Keeps the most recent samples per metric and reports count/mean/percentiles."""
+    def __init__(self, max_samples=10000):
+        self.max_samples = max_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, value):
+        with self._lock:
+            q = self._samples.get(name)
+            if q is None: q = self._samples[name] = deque(maxlen=self.max_samples)
+            q.append(value)
+
+    def summary(self, percentiles=(50, 90, 99)):
+        with self._lock:
+            snap = {k: sorted(v) for k, v in self._samples.items()}
+        out = {}
+        for name, vals in sorted(snap.items()):
+            row = {"count": len(vals), "mean": sum(vals) / len(vals), "max": vals[-1]}
+            for p in percentiles:
+                row[f"p{p}"] = vals[min(len(vals) - 1, int(round(p / 100 * (len(vals) - 1))))]
+            out[name] = row
+        return out
+
+    def clear(self):
+        with self._lock: self._samples.clear()
+
+# ---------- COLLECTION ----------
+class Collector:
+    """Receives every stage duration / metric recorded while it is active."""
+    def __init__(self, aggregator=None, hooks=()):
+        self.records = {}
+        self.aggregator = aggregator
+        self.hooks = list(hooks)
+
+    def add(self, name, value):
+        self.records[name] = self.records.get(name, 0) + value
+        if self.aggregator is not None: self.aggregator.add(name, value)
+        for h in self.hooks: h(name, value)
+
+class _Stage:
+    __slots__ = ("c", "name", "t0")
+    def __init__(self, c, name): self.c, self.name = c, name
+    def __enter__(self): self.t0 = time.perf_counter()
+    def __exit__(self, *exc): self.c.add(self.name, time.perf_counter() - self.t0)
+
+_ACTIVE = contextvars.ContextVar("instrument_collector", default=None)
+_GLOBAL = None
+_NULL = contextlib.nullcontext()
+
+def active():
+    return _ACTIVE.get() or _GLOBAL
+
+def stage(name):
+    """Time a block as `name` when recording; a shared no-op context otherwise."""
+    c = _ACTIVE.get() or _GLOBAL
+    return _NULL if c is None else _Stage(c, name)
+
+def metric(name, value):
+    c = _ACTIVE.get() or _GLOBAL
+    if c is not None: c.add(name, value)
+
+@contextlib.contextmanager
+def recording(aggregator=None, hooks=()):
+    """Record everything instrumented inside the block; yields the Collector."""
+    c = Collector(aggregator, hooks)
+    token = _ACTIVE.set(c)
+    try:
+        yield c
+    finally:
+        _ACTIVE.reset(token)
+
+def enable(aggregator=None, hooks=()):
+    """Record process-wide (e.g. in a server) into `aggregator`; returns the Collector."""
+    global _GLOBAL
+    _GLOBAL = Collector(aggregator or Aggregator(), hooks)
+    return _GLOBAL
+
+def disable():
+    global _GLOBAL
+    _GLOBAL = None
@@ -1,108 +1,393 @@
-from docx import Document
+import io, re
+from sections import default_classifier, split_skills
+from instrument import stage, metric
 
-def parse_txt(text_bytes: bytes) -> dict:
+# ---------- FIELDS ----------
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE = re.compile(r"(?<!\d)(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}(?!\d)")
+_PHONE_HINT = re.compile(r"[+(\d][\d\s().-]{8,18}\d")  # cheap pre-scan; PHONE confirms each hit
+LINK = re.compile(r"(?:https?://|www\.)\S+|\b(?:linkedin|github|gitlab)\.com/\S+", re.IGNORECASE)
+_PLACE = r"[A-Z][A-Za-z.' ]+, (?:[A-Z]{2}|[A-Z][a-z]+(?: [A-Z][a-z]+)*)"
+LOCATION = re.compile(rf"\b{_PLACE}\b|\bRemote\b")
+LOCATION_TAIL = re.compile(rf"(?:^|,\s*)({_PLACE}|Remote)\s*$")  # "School, City, ST" -> "City, ST"
+_MONTH = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sept?|Oct|Nov|Dec)[a-z]*\.?"
+DATE = re.compile(rf"\b(?:{_MONTH}\s+)?(?:19|20)\d{{2}}\b", re.IGNORECASE)
+DATE_RANGE = re.compile(rf"(?:{_MONTH}\s+)?(?:19|20)\d{{2}}\s*(?:-|–|—|to)\s*(?:(?:{_MONTH}\s+)?(?:19|20)\d{{2}}|present|current|now)\b",
+                        re.IGNORECASE)
+# "Role — Company", "Role - Company", "Role | Company"; a bare hyphen (Coca-Cola, Wal-Mart) never splits.
+HEADER_SEP = re.compile(r"\s*[—–|]\s*|\s+-\s+")
+HEADER_SEPS = ("—", "–", "|", " - ")  # cheap substring pre-check for HEADER_SEP
+DEGREE = re.compile(r"\b(?:Bachelor|Master|Associate|Doctor|Diploma|Ph\.?\s?D|MBA|B\.?\s?[ASE]\b\.?|M\.?\s?[ASE]\b\.?|B\.?Sc|M\.?Sc)", re.IGNORECASE)
+SCHOOL = re.compile(r"\b(?:University|College|Institute|School|Academy|Polytechnic)\b", re.IGNORECASE)
+BULLET_CHARS = "-•*·▪◦●–"
+
+def find_phone(text):
+    for m in _PHONE_HINT.finditer(text):
+        p = PHONE.search(m.group(0))
+        if p: return p.group(0).strip()
+    return None
+
+def contact_fields(lines, data):
+    """Fill email/phone/links/location from the first match in `lines` (fields already set win)."""
+    for ln in lines:
+        if "email" not in data and "@" in ln:
+            m = EMAIL.search(ln)
+            if m: data["email"] = m.group(0)
+        if "phone" not in data:
+            p = find_phone(ln)
+            if p: data["phone"] = p
+        for m in LINK.finditer(ln):
+            if "@" not in m.group(0): data.setdefault("links", []).append(m.group(0).rstrip(".,;)"))
+        if "location" not in data and ("@" in ln or len(ln) < 40 or find_phone(ln)):
+            m = LOCATION.search(EMAIL.sub("", ln))
+            if m: data["location"] = m.group(0)
+    if "links" in data: data["links"] = list(dict.fromkeys(data["links"]))
+    return data
+
+def split_header(line):
+    """(role, company) from a job header line, splitting only on spaced separators."""
+    parts = [p.strip() for p in HEADER_SEP.split(line) if p.strip()]
+    return (parts[0] if parts else ""), (parts[1] if len(parts) > 1 else "")
+
+def education_entries(lines):
+    """Education entries from the lines under an Education heading: a line naming a school (or,
+    failing that, a degree) opens an entry; grad dates and "City, ST" locations are lifted out."""
+    out, cur = [], None
+    for ln in lines:
+        ln = ln.lstrip(BULLET_CHARS + " ").strip()
+        if not ln: continue
+        is_school, is_degree = bool(SCHOOL.search(ln)), bool(DEGREE.search(ln))
+        if cur is None or (is_school and cur["school"]) or (is_degree and cur["degree"] and not is_school):
+            cur = {"school": "", "grad": "", "location": "", "degree": ""}
+            out.append(cur)
+        m = DATE.search(ln)
+        if m and not cur["grad"]:
+            cur["grad"] = m.group(0)
+            ln = (ln[:m.start()] + ln[m.end():]).strip(" ,|—–-")
+        m = LOCATION_TAIL.search(ln) if is_school or not is_degree else None
+        if m and not cur["location"] and (m.start() > 0 or not is_school):
+            cur["location"] = m.group(1)
+            ln = ln[:m.start()].strip(" ,|—–-")
+        if not ln: continue
+        if is_degree and not is_school: cur["degree"] = ln
+        elif not cur["school"]:
+            school, rest = split_header(ln)
+            cur["school"] = school.strip(" ,")
+            if rest and not cur["location"]: cur["location"] = rest
+        elif not cur["degree"]: cur["degree"] = ln
+    return out
+
+def _looks_like_bullet(line):
+    return line[0] in BULLET_CHARS or (len(line) > 60 and line.endswith("."))
+
+def _is_contact(line):
+    return bool(("@" in line and EMAIL.search(line)) or find_phone(line) or LINK.search(line))
+
+def _header_fields(data, header):
+    """Contact details and a title from the lines above the first heading; returns the rest."""
+    contact_fields(header[:8], data)
+    rest = [l for l in header if not _is_contact(l) and not LOCATION.fullmatch(l)]
+    if rest and len(rest[0]) <= 60 and not rest[0].endswith(".") and "title" not in data:
+        data["title"] = rest[0]
+        rest = rest[1:]
+    return rest
+
+def _common_fields(data, sections):
+    intro = _header_fields(data, sections.get("header", []))
+    summary = sections["summary"] or intro  # no Summary heading: the prose under the name
+    if summary:
+        data["summary"] = " ".join(summary[:4])
+    if sections["skills"]:
+        data["skills"] = split_skills(sections["skills"])
+    if sections["certifications"]:
+        data["certifications"] = [c.lstrip("-•* ").strip() for c in sections["certifications"]]
+    if sections["education"]:
+        data["education"] = education_entries(sections["education"])
+
+# ---------- FAST PARSE ----------
+# One streaming pass with fixed heuristics. Every result carries a confidence score (see score),
+# so callers can send the low-confidence tail through the thorough strategies below.
+def parse_txt(text_bytes: bytes, classifier=None) -> dict:
+    with stage("parse.txt"):
+        data = _parse_txt(text_bytes, classifier)
+    metric("parse.bytes", len(text_bytes))
+    return _scored(data, "fast")
+
+def _txt_lines(text_bytes):
     text = text_bytes.decode("utf-8", errors="ignore")
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    return [l.strip() for l in text.splitlines() if l.strip()]
+
+def _parse_txt(text_bytes, classifier):
+    lines = _txt_lines(text_bytes)
     # naive heuristics
     data = {"experience": [], "education": [], "skills": []}
     # First non-empty line as name guess
     if lines:
         data["name"] = lines[0]
-    # Find sections by keywords
-    sections = {"summary": [], "experience": [], "education": [], "skills": []}
-    current = "summary"
-    for ln in lines[1:]:
-        low = ln.lower()
-        if "experience" in low:
-            current = "experience"; continue
-        if "education" in low:
-            current = "education"; continue
-        if "skill" in low:
-            current = "skills"; continue
-        sections[current].append(ln)
-    if sections["summary"]:
-        data["summary"] = " ".join(sections["summary"][:4])
-    if sections["skills"]:
-        # split by commas
-        toks = []
-        for s in sections["skills"]:
-            toks.extend([t.strip() for t in s.split(",") if t.strip()])
-        data["skills"] = toks[:30]
-    if sections["experience"]:
-        # group every 4-5 lines into one job
-        chunk, buf = [], []
-        for s in sections["experience"]:
-            if s.endswith(".") or "-" in s:
-                buf.append(s)
-                if len(buf) >= 5:
-                    chunk.append(buf); buf = []
-            else:
-                buf.append(s)
-        if buf: chunk.append(buf)
-        for c in chunk:
-            bullets = [x for x in c[1:] if x and not x.isupper()]
-            data["experience"].append({
-                "role": c[0] if c else "",
-                "company": "",
-                "dates": "",
-                "location": "",
-                "bullets": bullets[:6]
-            })
+    sections = (classifier or default_classifier()).split(lines[1:], start="header")
+    _common_fields(data, sections)
+    data["experience"] = fast_jobs(sections["experience"])
     return data
 
-def parse_docx(file_bytes: bytes) -> dict:
-    # Save temp, open with python-docx
-    import tempfile, os
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-        tmp.write(file_bytes)
-        tmp_path = tmp.name
-    doc = Document(tmp_path)
-    os.unlink(tmp_path)
-    paras = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_RUN_TEXT = {W+"t": None, W+"tab": "\t", W+"ptab": "\t", W+"br": "\n", W+"cr": "\n", W+"noBreakHyphen": "-"}
+
+def _run_text(r, out):
+    for c in r:
+        if c.tag in _RUN_TEXT:
+            sub = _RUN_TEXT[c.tag]
+            out.append((c.text or "") if sub is None else sub)
+
+def _main_part(zf):
+    """Name of the main document part, found as python-docx does through the package's
+    officeDocument relationship (Word Online writes word/document2.xml, for one)."""
+    from lxml import etree
+    try:
+        rels = etree.fromstring(zf.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels:
+        if rel.get("Type", "").endswith("/officeDocument"):
+            return rel.get("Target", "").lstrip("/")
+    return "word/document.xml"
+
+def iter_docx_paragraphs(file_bytes: bytes, styles=False):
+    """Stream the text of top-level body paragraphs straight from the DOCX zip.
+    Elements are freed as soon as they are read, so memory stays flat on long documents.
+    With styles=True yields (text, style id, is list item) instead of just the text."""
+    import zipfile
+    from lxml import etree
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as zf, zf.open(_main_part(zf)) as xml:
+        for _, el in etree.iterparse(xml, events=("end",), tag=(W+"p", W+"tbl", W+"sectPr")):
+            parent = el.getparent()
+            if parent is None or parent.tag != W+"body":
+                continue
+            if el.tag == W+"p":
+                out, style, listed = [], "", False
+                for c in el:
+                    if c.tag == W+"r":
+                        _run_text(c, out)
+                    elif c.tag == W+"hyperlink":
+                        for r in c.iterchildren(W+"r"):
+                            _run_text(r, out)
+                    elif styles and c.tag == W+"pPr":
+                        ps = c.find(W+"pStyle")
+                        if ps is not None: style = ps.get(W+"val", "")
+                        listed = c.find(W+"numPr") is not None
+                yield ("".join(out), style, listed) if styles else "".join(out)
+            el.clear()
+            while el.getprevious() is not None:
+                del parent[0]
+
+def parse_docx(file_bytes: bytes, classifier=None) -> dict:
+    with stage("parse.docx"):
+        data = _parse_docx(file_bytes, classifier)
+    metric("parse.bytes", len(file_bytes))
+    return _scored(data, "fast")
+
+def _new_job():
+    return {"role":"","company":"","dates":"","location":"","bullets":[]}
+
+def fast_jobs(lines):
+    """Jobs from the lines under an Experience heading, one cheap test per line: bullets (marked,
+    or long sentences) belong to the current job, a date range sets its dates, and a
+    "Role — Company" line opens the next job. A date line after bullets opens one too, for
+    layouts that put the dates above the header."""
+    jobs, job = [], _new_job()
+    for line in lines:
+        if _looks_like_bullet(line):
+            job["bullets"].append(line.lstrip(BULLET_CHARS + " ").strip())
+            continue
+        m = DATE_RANGE.search(line) if ("19" in line or "20" in line) else None
+        if m:
+            if job["dates"] or job["bullets"]:
+                jobs.append(job); job = _new_job()
+            job["dates"] = m.group(0)
+            line = (line[:m.start()] + line[m.end():]).strip(" ,|()—–-")
+            if not line: continue
+        if any(sep in line for sep in HEADER_SEPS):
+            if job["role"] or job["bullets"]:
+                jobs.append(job); job = _new_job()
+            job["role"], job["company"] = split_header(line)
+        elif not job["location"] and len(line) < 40 and LOCATION.fullmatch(line):
+            job["location"] = line
+        else:
+            job["bullets"].append(line)  # free text
+    if job["role"] or job["bullets"]:
+        jobs.append(job)
+    return jobs
+
+def _parse_docx(file_bytes, classifier):
     data = {"experience": [], "education": [], "skills": []}
-    if paras:
-        data["name"] = paras[0]
-    # Section detection by headings and keywords
-    sections = {"summary": [], "experience": [], "education": [], "skills": []}
-    current = "summary"
-    for p in doc.paragraphs[1:]:
-        text = p.text.strip()
+    paras = (t.strip() for t in iter_docx_paragraphs(file_bytes))
+    paras = (t for t in paras if t)
+    name = next(paras, None)
+    if name is not None:
+        data["name"] = name
+    # Headings are classified as the paragraphs stream past
+    sections = (classifier or default_classifier()).split(paras, start="header")
+    _common_fields(data, sections)
+    data["experience"] = fast_jobs(sections["experience"])
+    return data
+
+# ---------- THOROUGH PARSE ----------
+# Slower strategies for documents the fast pass scored low: DOCX paragraph styles (Title,
+# Heading n, list numbering) decide names, headings and bullets; job entries are rebuilt from
+# their header lines with dates and locations lifted out; contact details are searched for in
+# the whole text rather than just the header.
+def group_jobs(entries):
+    """Jobs from (text, is_bullet) pairs: the non-bullet lines before a run of bullets are that
+    job's header (dates and location in any order; "Role — Company" on one line, or company and
+    role on two lines as resume_template lays them out)."""
+    jobs, job, joined = [], None, False
+    for text, bullet in entries:
+        if bullet or _looks_like_bullet(text):
+            if job is None: job = _new_job(); jobs.append(job)
+            job["bullets"].append(text.lstrip(BULLET_CHARS + " ").strip())
+            continue
+        if job is None or job["bullets"]:
+            job = _new_job(); jobs.append(job)
+            joined = False
+        m = DATE_RANGE.search(text)
+        if m:
+            if not job["dates"]: job["dates"] = m.group(0)
+            text = (text[:m.start()] + text[m.end():]).strip(" ,|()—–-")
         if not text: continue
-        style_name = (p.style.name or "").lower()
-        tlow = text.lower()
-        if any(k in tlow for k in ["experience"]):
-            current = "experience"; continue
-        if any(k in tlow for k in ["education"]):
-            current = "education"; continue
-        if any(k in tlow for k in ["skill"]):
-            current = "skills"; continue
-        sections[current].append(text)
-    if sections["summary"]:
-        data["summary"] = " ".join(sections["summary"][:4])
-    if sections["skills"]:
-        toks = []
-        for s in sections["skills"]:
-            toks.extend([t.strip() for t in s.split(",") if t.strip()])
-        data["skills"] = toks[:30]
-    if sections["experience"]:
-        # Simple bullet grouping: blank lines or bullet prefixes
-        job = {"role":"","company":"","dates":"","location":"","bullets":[]}
-        for line in sections["experience"]:
-            if line.startswith(("-", "•")):
-                job["bullets"].append(line.lstrip("-• ").strip())
-            elif any(sep in line for sep in ["—", " - "]):
-                # treat as a header line "Role — Company"
-                parts = [x.strip() for x in line.replace("—","-").split("-")]
-                if job["role"] or job["bullets"]:
-                    data["experience"].append(job); job = {"role":"","company":"","dates":"","location":"","bullets":[]}
-                if parts:
-                    job["role"] = parts[0]
-                if len(parts) > 1:
-                    job["company"] = parts[1]
+        loc = LOCATION.fullmatch(text)
+        if loc and not job["location"]:
+            job["location"] = text
+        elif not job["role"]:
+            job["role"], job["company"] = split_header(text)
+            joined = bool(job["company"])
+        elif not job["company"] and not joined:
+            job["company"], job["role"] = job["role"], text
+        elif not job["location"] and LOCATION.search(text):
+            job["location"] = LOCATION.search(text).group(0)
+        else:
+            job["bullets"].append(text)
+    return jobs
+
+def _structured(items, classifier, data):
+    """Shared thorough pass over (text, hint) pairs; hint is "title", "heading", "bullet" or ""."""
+    clf = classifier or default_classifier()
+    buckets = {s: [] for s in clf.sections}
+    header, current, texts, contact = [], None, [], []
+    for text, hint in items:
+        texts.append(text)
+        if hint == "title" and "name" not in data:
+            data["name"] = text
+            continue
+        h = clf.heading(text) if hint != "bullet" else None
+        if h is not None or hint == "heading":
+            current = buckets.setdefault(h[0] if h else "other:" + text.lower(), [])
+            if h and h[1]: current.append((h[1], False))
+            continue
+        if current is not None and len(text) < 80 and _is_contact(text):
+            contact.append(text)  # a footer or sidebar contact line, not section content
+            continue
+        if current is None:
+            if "name" not in data and not _is_contact(text) and len(text.split()) <= 5:
+                data["name"] = text
             else:
-                # free text appended to bullets
-                if line:
-                    job["bullets"].append(line)
-        if job["role"] or job["bullets"]:
-            data["experience"].append(job)
+                header.append(text)
+        else:
+            current.append((text, hint == "bullet"))
+    sections = {k: [t for t, _ in v] for k, v in buckets.items()}
+    sections["header"] = header
+    _common_fields(data, sections)
+    data["experience"] = group_jobs(buckets["experience"])
+    contact_fields(contact, data)
+    # Contact details still missing may sit inside longer lines: search the whole text once.
+    rest = "\n".join(texts)
+    m = "email" not in data and "@" in rest and EMAIL.search(rest)
+    if m: data["email"] = m.group(0)
+    p = "phone" not in data and find_phone(rest)
+    if p: data["phone"] = p
+    return data
+
+def parse_txt_thorough(text_bytes: bytes, classifier=None) -> dict:
+    with stage("parse.txt_thorough"):
+        items = ((l, "bullet" if l[0] in BULLET_CHARS else "") for l in _txt_lines(text_bytes))
+        data = _structured(items, classifier, {"experience": [], "education": [], "skills": []})
+    return _scored(data, "thorough")
+
+def parse_docx_thorough(file_bytes: bytes, classifier=None) -> dict:
+    with stage("parse.docx_thorough"):
+        def items():
+            for text, style, listed in iter_docx_paragraphs(file_bytes, styles=True):
+                text = text.strip()
+                if not text: continue
+                st = style.lower()
+                if st == "title": hint = "title"
+                elif st.startswith("heading"): hint = "heading"
+                elif listed or "list" in st or text[0] in BULLET_CHARS: hint = "bullet"
+                else: hint = ""
+                yield text, hint
+        data = _structured(items(), classifier, {"experience": [], "education": [], "skills": []})
+    return _scored(data, "thorough")
+
+# ---------- CONFIDENCE ----------
+# Field weights for the overall score; each field scores 0..1.
+CONFIDENCE_WEIGHTS = {"name": 2, "email": 1, "phone": 1, "experience": 3, "education": 1, "skills": 1, "summary": 1}
+
+def _score_name(v):
+    if not v: return 0.0
+    words = v.split()
+    if _is_contact(v) or any(c.isdigit() for c in v) or len(v) > 40: return 0.1
+    return 1.0 if 2 <= len(words) <= 4 and all(w[0].isupper() for w in words) else 0.5
+
+def _score_job(j):
+    if DATE.fullmatch(j.get("role", "")) or DATE.fullmatch(j.get("company", "")):
+        return 0.0  # a date line mistaken for "Role — Company"
+    s = 0.3 if j.get("role") else 0.0
+    s += 0.2 if j.get("company") else 0.0
+    s += 0.2 if DATE.search(j.get("dates", "")) else 0.0
+    s += 0.1 if j.get("location") else 0.0
+    b = j.get("bullets", [])
+    s += 0.2 if b and all(len(x) < 400 for x in b) else 0.0
+    return s
+
+def score(data):
+    """{"fields": {field: 0..1}, "overall": weighted mean} for one parse result."""
+    jobs, edus, skills = data.get("experience", []), data.get("education", []), data.get("skills", [])
+    f = {
+        "name": _score_name(data.get("name", "")),
+        "email": 1.0 if EMAIL.fullmatch(data.get("email", "")) else 0.0,
+        "phone": 1.0 if PHONE.fullmatch(data.get("phone", "")) else 0.0,
+        "experience": sum(map(_score_job, jobs)) / len(jobs) if jobs else 0.0,
+        "education": sum((0.6 if e.get("school") else 0) + (0.4 if e.get("degree") or e.get("grad") else 0)
+                         for e in edus) / len(edus) if edus else 0.0,
+        "skills": (1.0 if all(len(s) <= 40 for s in skills) else 0.5) if 2 <= len(skills) else 0.3 * len(skills),
+        "summary": 1.0 if 40 <= len(data.get("summary", "")) <= 1500 else (0.5 if data.get("summary") else 0.0),
+    }
+    total = sum(CONFIDENCE_WEIGHTS.values())
+    return {"fields": {k: round(v, 2) for k, v in f.items()},
+            "overall": round(sum(f[k] * w for k, w in CONFIDENCE_WEIGHTS.items()) / total, 3)}
+
+def _scored(data, strategy):
+    data["confidence"] = dict(score(data), strategy=strategy)
     return data
+
+# ---------- API ----------
+MIN_CONFIDENCE = 0.6
+CRITICAL_FIELDS = ("name", "experience")  # a weak score here re-parses even if the overall is fine
+
+def low_confidence(conf, floor=MIN_CONFIDENCE):
+    f = conf["fields"]
+    # No email and no phone at all usually means they sit where the fast pass does not look
+    # (a footer or sidebar).
+    return (conf["overall"] < floor or any(f[k] < floor for k in CRITICAL_FIELDS)
+            or not (f["email"] or f["phone"]))
+
+def parse(raw: bytes, kind: str, classifier=None, min_confidence=MIN_CONFIDENCE, thorough=None) -> dict:
+    """Fast parse of a "docx" or "txt" document, re-run with the thorough strategy when its
+    confidence is low (see low_confidence; thorough=True/False forces either). The
+    higher-scoring result is returned; data["confidence"] says which strategy produced it."""
+    fast, slow = (parse_docx, parse_docx_thorough) if kind == "docx" else (parse_txt, parse_txt_thorough)
+    if thorough: return slow(raw, classifier)
+    data = fast(raw, classifier)
+    if thorough is False or not low_confidence(data["confidence"], min_confidence):
+        return data
+    metric("parse.escalated", 1)
+    better = slow(raw, classifier)
+    return better if better["confidence"]["overall"] >= data["confidence"]["overall"] else data
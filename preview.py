@@ -0,0 +1,70 @@
+import io, json, time
+from resume_template import SectionCache, build_story, compile_theme, make_doc
+
+class IncrementalRenderer:
+    """Live first-page preview that rebuilds only the sections whose slice of data changed.
+
+    Section flowables come from a resume_template.SectionCache, so unchanged sections are
+    restored instead of rebuilt. Renders are debounced: calls arriving within `debounce`
+    seconds of the previous render return the last image and report it as stale."""
+    def __init__(self, max_sections=256, debounce=0.4, scale=1.5):
+        self.sections = SectionCache(max_sections)
+        self.debounce = debounce
+        self.scale = scale
+        self._last_key = None
+        self._last_png = None
+        self._last_at = 0.0
+
+    @property
+    def rebuilt(self): return self.sections.misses
+
+    @property
+    def reused(self): return self.sections.hits
+
+    def story(self, data, theme=None):
+        return build_story(data, theme, self.sections)
+
+    def first_page_pdf(self, data, theme=None):
+        """PDF holding the first page, built from only the flowables that can land on it."""
+        ct = compile_theme(theme)
+        story = self.story(data, ct)
+        buf = io.BytesIO()
+        doc = make_doc(buf, data, theme=ct)
+        doc.build(_first_page(story, ct))
+        return buf.getvalue()
+
+    def first_page_png(self, data, theme=None):
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(self.first_page_pdf(data, theme))
+        try:
+            img = pdf[0].render(scale=self.scale).to_pil()
+        finally:
+            pdf.close()
+        out = io.BytesIO()
+        img.save(out, format="PNG")
+        return out.getvalue()
+
+    def preview(self, data, theme=None, now=None):
+        """(png, fresh). Within the debounce window a changed input returns the previous image
+        with fresh=False; call again later (e.g. on a timer) to pick up the change."""
+        now = time.monotonic() if now is None else now
+        key = json.dumps([data, compile_theme(theme).key], sort_keys=True, default=str)
+        if key == self._last_key:
+            return self._last_png, True
+        if self._last_png is not None and now - self._last_at < self.debounce:
+            return self._last_png, False
+        self._last_png = self.first_page_png(data, theme)
+        self._last_key, self._last_at = key, now
+        return self._last_png, True
+
+def _first_page(story, ct):
+    from reportlab.pdfgen.canvas import Canvas
+    canv = Canvas(io.BytesIO(), pagesize=ct.page_size)
+    avail_w, avail_h = ct.frame_width, ct.frame_height
+    y = 0.0
+    for i, f in enumerate(story):
+        y += f.wrapOn(canv, avail_w, avail_h)[1]
+        if y > avail_h:
+            return story[:i + 1]  # the overflowing flowable may still split onto page one
+        y += f.getSpaceAfter() + f.getSpaceBefore()
+    return story
@@ -0,0 +1,141 @@
+import hashlib, json, os, threading
+from collections import OrderedDict
+# resume_template (and with it ReportLab) is imported on first use to keep this module cheap to import.
+
+# Part of every key, so the disk tier never serves PDFs from an older renderer across deploys.
+# Bump whenever resume_template/docmodel change the output for the same data and theme.
+RENDER_VERSION = 1
+
+def render_key(data, theme=None, page_size=None, margins=None):
+    """Canonical hash of the resume payload plus the effective (compiled) theme and geometry,
+    salted with RENDER_VERSION and the ReportLab version."""
+    import reportlab
+    from resume_template import compile_theme
+    ct = compile_theme(theme)
+    raw = json.dumps([RENDER_VERSION, reportlab.Version, data, ct.key, page_size, margins], sort_keys=True,
+                     separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class RenderCache:
+    """Two-tier (memory + disk) LRU cache of rendered PDFs, bounded by total bytes per tier."""
+    def __init__(self, max_memory_bytes=64 << 20, disk_dir=".render_cache", max_disk_bytes=512 << 20):
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hits_memory = self.hits_disk = self.misses = 0
+        self._mem = OrderedDict()   # key -> bytes
+        self._mem_bytes = 0
+        self._disk = OrderedDict()  # key -> size, oldest first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    # ---------- memory tier ----------
+    def _mem_put(self, key, pdf):
+        old = self._mem.pop(key, None)
+        if old is not None: self._mem_bytes -= len(old)
+        if len(pdf) > self.max_memory_bytes: return
+        self._mem[key] = pdf
+        self._mem_bytes += len(pdf)
+        while self._mem_bytes > self.max_memory_bytes:
+            _, ev = self._mem.popitem(last=False)
+            self._mem_bytes -= len(ev)
+
+    # ---------- disk tier ----------
+    def _path(self, key): return os.path.join(self.disk_dir, key[:2], key + ".pdf")
+
+    def _scan_disk(self):
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for fn in files:
+                if not fn.endswith(".pdf"): continue
+                st = os.stat(os.path.join(root, fn))
+                entries.append((st.st_mtime, fn[:-4], st.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _disk_get(self, key):
+        if key not in self._disk: return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf = f.read()
+            os.utime(path)
+        except FileNotFoundError:  # evicted by another process sharing the directory
+            self._disk_bytes -= self._disk.pop(key)
+            return None
+        self._disk.move_to_end(key)
+        return pdf
+
+    def _disk_put(self, key, pdf):
+        if len(pdf) > self.max_disk_bytes: return
+        from resume_template import write_atomic
+        write_atomic(self._path(key), pdf)
+        self._disk_bytes -= self._disk.pop(key, 0)
+        self._disk[key] = len(pdf)
+        self._disk_bytes += len(pdf)
+        while self._disk_bytes > self.max_disk_bytes:
+            ev, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try: os.unlink(self._path(ev))
+            except FileNotFoundError: pass
+
+    # ---------- public ----------
+    def get(self, key):
+        with self._lock:
+            pdf = self._mem.get(key)
+            if pdf is not None:
+                self._mem.move_to_end(key)
+                self.hits_memory += 1
+                return pdf
+            if self.disk_dir:
+                pdf = self._disk_get(key)
+                if pdf is not None:
+                    self._mem_put(key, pdf)
+                    self.hits_disk += 1
+                    return pdf
+            self.misses += 1
+            return None
+
+    def put(self, key, pdf):
+        with self._lock:
+            self._mem_put(key, pdf)
+            if self.disk_dir: self._disk_put(key, pdf)
+
+    def render(self, data, theme=None, page_size=None, margins=None):
+        """Cached equivalent of render_pdf_bytes."""
+        key = render_key(data, theme, page_size, margins)
+        pdf = self.get(key)
+        if pdf is None:
+            from resume_template import render_pdf_bytes
+            pdf = render_pdf_bytes(data, page_size=page_size, margins=margins, theme=theme)
+            self.put(key, pdf)
+        return pdf
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear(); self._mem_bytes = 0
+            for key in list(self._disk):
+                try: os.unlink(self._path(key))
+                except FileNotFoundError: pass
+            self._disk.clear(); self._disk_bytes = 0
+
+    def stats(self):
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            "hits_memory": self.hits_memory, "hits_disk": self.hits_disk, "misses": self.misses,
+            "hit_rate": (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+            "memory_entries": len(self._mem), "memory_bytes": self._mem_bytes,
+            "disk_entries": len(self._disk), "disk_bytes": self._disk_bytes,
+        }
+
+_DEFAULT = None
+
+def default_cache():
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = RenderCache()
+    return _DEFAULT
@@ -1,147 +1,383 @@
 from reportlab.lib.pagesizes import LETTER, A4
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, ListFlowable, ListItem, Table, TableStyle
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, ListFlowable, Table, TableStyle
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.enums import TA_LEFT
 from reportlab.lib.units import inch
 from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-import os, yaml
+from reportlab.pdfgen.canvas import Canvas
+import copy, hashlib, io, json, os, pickle, tempfile, threading
+from collections import OrderedDict
+from instrument import stage, metric, active
+from fonts import STORE
+from schema import validate
+import docmodel
 
 # ---------- THEME ----------
-def load_theme(path="theme.yaml"):
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            return yaml.safe_load(f) or {}
-    return {}
-THEME = load_theme()
-
-def register_fonts():
-    prefer_ttf = THEME.get("fonts", {}).get("prefer_ttf", False)
-    reg_path   = THEME.get("fonts", {}).get("ttf_regular", "Inter-Regular.ttf")
-    bold_path  = THEME.get("fonts", {}).get("ttf_bold", "Inter-Bold.ttf")
-    base = THEME.get("fonts", {}).get("base", "Helvetica")
-    bold = THEME.get("fonts", {}).get("bold", "Helvetica-Bold")
-    if prefer_ttf and os.path.exists(reg_path) and os.path.exists(bold_path):
-        try:
-            pdfmetrics.registerFont(TTFont("Tpl-Regular", reg_path))
-            pdfmetrics.registerFont(TTFont("Tpl-Bold", bold_path))
-            base, bold = "Tpl-Regular", "Tpl-Bold"
-        except Exception:
-            pass
-    return base, bold
-
-BASE_FONT, BOLD_FONT = register_fonts()
-
-def page_and_margins():
-    ps = (THEME.get("page_size") or "LETTER").upper()
-    page = LETTER if ps == "LETTER" else A4
-    m = THEME.get("margins_in", {"left":0.7, "right":0.7, "top":0.7, "bottom":0.7})
-    return page, (m["left"]*inch, m["right"]*inch, m["top"]*inch, m["bottom"]*inch)
+load_theme = docmodel.load_theme
 
-# ---------- STYLES ----------
-sizes  = THEME.get("sizes", {})
-accent = colors.HexColor(THEME.get("colors", {}).get("accent_hex", "#000000"))
-muted  = colors.HexColor(THEME.get("colors", {}).get("muted_hex", "#444444"))
-textc  = colors.HexColor(THEME.get("colors", {}).get("text_hex", "#000000"))
+# The default theme is compiled (fonts, styles) on first use rather than at import, so
+# importing this module for --help/validation stays cheap. theme.yaml itself is read once,
+# by docmodel, which lays out documents from the same dict.
+_LAZY = {}
+_theme = docmodel.default_theme_dict
 
-def _sz(k, d): return sizes.get(k, d)
-H1     = ParagraphStyle("H1",     fontName=BOLD_FONT, fontSize=_sz("h1",18),   leading=_sz("h1",18)+_sz("leading_adjust",2), textColor=accent, spaceAfter=6)
-H2     = ParagraphStyle("H2",     fontName=BOLD_FONT, fontSize=_sz("h2",12),   leading=_sz("h2",12)+_sz("leading_adjust",2), textColor=accent, spaceBefore=10, spaceAfter=4)
-BODY   = ParagraphStyle("BODY",   fontName=BASE_FONT, fontSize=_sz("body",10.5),leading=_sz("body",10.5)+_sz("leading_adjust",2), textColor=textc)
-META   = ParagraphStyle("META",   fontName=BASE_FONT, fontSize=_sz("meta",9.5),leading=_sz("meta",9.5)+_sz("leading_adjust",2), textColor=muted)
-BULLET = ParagraphStyle("BULLET", fontName=BASE_FONT, fontSize=_sz("body",10.5),leading=_sz("body",10.5)+_sz("leading_adjust",2), leftIndent=12, textColor=textc)
+def theme_key(theme):
+    """Content hash of a theme dict; equal themes share one compiled entry."""
+    raw = json.dumps(theme or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
-LABELS = THEME.get("labels", {})
-def label(key, default): return LABELS.get(key, default)
+def register_fonts(theme=None):
+    """(regular, bold) font names for a theme; TTFs come from the shared fonts.STORE."""
+    return STORE.resolve((_theme() if theme is None else theme).get("fonts", {}))
 
-# ---------- RENDER HELPERS ----------
-def bullet_list(items):
-    return ListFlowable([ListItem(Paragraph(i, BULLET)) for i in items], bulletType="bullet")
-
-def draw_header(story, data):
-    name     = data.get("name","")
-    email    = data.get("email","")
-    phone    = data.get("phone","")
-    location = data.get("location","")
-    links    = data.get("links",[])
-    story.append(Paragraph(name, H1))
-    bits = [b for b in [location, email, phone] if b]
-    if links: bits.extend(links)
-    if bits: story.append(Paragraph(" &#8226; ".join(bits), META))
-    story.append(Spacer(1,6))
-
-def draw_summary(story, data):
-    s = data.get("summary","")
-    if s:
-        story.append(Paragraph(label("summary","SUMMARY"), H2))
-        story.append(Paragraph(s, BODY))
-
-def draw_skills(story, data):
-    skills = data.get("skills",[])
-    if skills:
-        story.append(Paragraph(label("skills","SKILLS AND SOFTWARE PROFICIENCIES"), H2))
-        story.append(Paragraph(" &#8226; ".join(skills), BODY))
-
-def draw_experience(story, data):
-    jobs = data.get("experience",[])
-    if not jobs: return
-    story.append(Paragraph(label("experience","RELEVANT EXPERIENCES"), H2))
-    for j in jobs:
-        org  = j.get("company","") or j.get("organization","")
-        role = j.get("role","")
-        dates= j.get("dates","")
-        loc  = j.get("location","")
-        if org:  story.append(Paragraph(org, BODY))
-        if role: story.append(Paragraph(role, BODY))
-        if dates:story.append(Paragraph(dates, META))
-        if loc:  story.append(Paragraph(loc, META))
-        bullets = j.get("bullets",[])
-        if bullets: story.append(bullet_list(bullets))
-
-def draw_education(story, data):
-    edus = data.get("education",[])
-    if not edus: return
-    story.append(Paragraph(label("education","EDUCATION"), H2))
-    for e in edus:
-        school   = e.get("school","")
-        grad     = e.get("grad","") or e.get("dates","")
-        location = e.get("location","")
-        degree   = e.get("degree","")
-        left = school + (f", {grad}" if grad else "")
-        tbl = Table([[Paragraph(left, BODY), Paragraph(location, META)]], colWidths=[4.6*inch, 2.4*inch])
-        tbl.setStyle(TableStyle([
+def _page(ps):
+    if not isinstance(ps, str): return ps
+    return A4 if ps.upper() == "A4" else LETTER
+
+def page_and_margins(theme=None):
+    theme = _theme() if theme is None else theme
+    page = _page(theme.get("page_size") or "LETTER")
+    m = theme.get("margins_in") or {}
+    return page, tuple(float(m.get(k, 0.7))*inch for k in ("left", "right", "top", "bottom"))
+
+# ---------- STYLES ----------
+DEFAULT_SECTION_ORDER = docmodel.DEFAULT_SECTION_ORDER
+FRAME_PADDING = 6
+EDU_COL_FRACTIONS = (4.6/7.0, 2.4/7.0)  # school/grad | location, as in the original 4.6in + 2.4in layout
+
+class CompiledTheme:
+    """Fonts, page geometry, ParagraphStyles and labels resolved once for one theme dict."""
+    def __init__(self, theme, key=None):
+        self.theme = copy.deepcopy(theme or {})
+        self.key = key or theme_key(self.theme)
+        with stage("render.fonts"):
+            self.base_font, self.bold_font = register_fonts(self.theme)
+        self.page_size, self.margins = page_and_margins(self.theme)
+        sizes  = self.theme.get("sizes", {})
+        cols   = self.theme.get("colors", {})
+        accent = colors.HexColor(cols.get("accent_hex", "#000000"))
+        muted  = colors.HexColor(cols.get("muted_hex", "#444444"))
+        textc  = colors.HexColor(cols.get("text_hex", "#000000"))
+        def _sz(k, d): return sizes.get(k, d)
+        lead = _sz("leading_adjust", 2)
+        B, R = self.bold_font, self.base_font
+        self.H1     = ParagraphStyle("H1",     fontName=B, fontSize=_sz("h1",18),   leading=_sz("h1",18)+lead, textColor=accent, spaceAfter=6)
+        self.H2     = ParagraphStyle("H2",     fontName=B, fontSize=_sz("h2",12),   leading=_sz("h2",12)+lead, textColor=accent, spaceBefore=10, spaceAfter=4)
+        self.BODY   = ParagraphStyle("BODY",   fontName=R, fontSize=_sz("body",10.5),leading=_sz("body",10.5)+lead, textColor=textc)
+        self.META   = ParagraphStyle("META",   fontName=R, fontSize=_sz("meta",9.5),leading=_sz("meta",9.5)+lead, textColor=muted)
+        self.BULLET = ParagraphStyle("BULLET", fontName=R, fontSize=_sz("body",10.5),leading=_sz("body",10.5)+lead, leftIndent=12, textColor=textc)
+        self.EDU_TABLE = TableStyle([
             ("VALIGN",(0,0),(-1,-1),"TOP"),
             ("ALIGN",(1,0),(1,0),"RIGHT"),
             ("LEFTPADDING",(0,0),(-1,-1),0), ("RIGHTPADDING",(0,0),(-1,-1),0),
             ("TOPPADDING",(0,0),(-1,-1),0),  ("BOTTOMPADDING",(0,0),(-1,-1),0),
-        ]))
-        story.append(tbl)
-        if degree: story.append(Paragraph(degree, BODY))
-        story.append(Spacer(1,4))
-
-def draw_certifications(story, data):
-    certs = data.get("certifications",[])
-    if certs:
-        story.append(Paragraph(label("certifications","CERTIFICATIONS"), H2))
-        story.append(Paragraph(", ".join(certs), BODY))
-
-SECTION_ORDER = THEME.get("section_order", ["header","summary","education","skills","experience","certifications"])
-
-def render_pdf(data, out_path="output/resume.pdf", page_size=None, margins=None):
-    """PUBLIC API used by app.py"""
-    page_size, margins = page_and_margins()
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    doc = SimpleDocTemplate(out_path, pagesize=page_size,
-                            leftMargin=margins[0], rightMargin=margins[1],
-                            topMargin=margins[2],  bottomMargin=margins[3],
-                            title=data.get("name","Resume"))
+        ])
+        self.labels = self.theme.get("labels", {})
+        self.section_labels = docmodel.labels_for(self.theme)
+        self.section_order = docmodel.section_order(self.theme)
+        self._set_page(self.page_size, self.margins)
+        self._variants = {}
+
+    def _set_page(self, page_size, margins):
+        self.page_size, self.margins = page_size, margins
+        # SimpleDocTemplate's frame pads 6pt on each side of the margins.
+        self.frame_width  = page_size[0] - margins[0] - margins[1] - 2*FRAME_PADDING
+        self.frame_height = page_size[1] - margins[2] - margins[3] - 2*FRAME_PADDING
+        self.edu_cols = [self.frame_width * f for f in EDU_COL_FRACTIONS]
+
+    def with_page(self, page_size=None, margins=None):
+        """This theme laid out on another page size/margins; variants are cached per geometry."""
+        page_size = _page(page_size) if page_size else self.page_size
+        margins = tuple(margins) if margins else self.margins
+        if page_size == self.page_size and margins == self.margins: return self
+        key = (tuple(page_size), margins)
+        v = self._variants.get(key)
+        if v is None:
+            v = copy.copy(self)
+            v._set_page(page_size, margins)
+            v._variants = {}
+            self._variants[key] = v
+        return v
+
+    def label(self, key, default): return self.labels.get(key, default)
+
+THEME_CACHE_SIZE = 32
+_THEME_CACHE = OrderedDict()
+_THEME_LOCK = threading.Lock()
+
+def compile_theme(theme=None):
+    """Return the CompiledTheme for a theme dict (or theme.yaml path), LRU-cached by content hash."""
+    if isinstance(theme, CompiledTheme): return theme
+    if theme is None: return default_theme()
+    elif isinstance(theme, str): theme = load_theme(theme)
+    key = theme_key(theme)
+    with _THEME_LOCK:
+        ct = _THEME_CACHE.get(key)
+        if ct is not None:
+            _THEME_CACHE.move_to_end(key)
+            return ct
+    ct = CompiledTheme(theme, key)
+    with _THEME_LOCK:
+        _THEME_CACHE[key] = ct
+        while len(_THEME_CACHE) > THEME_CACHE_SIZE:
+            _THEME_CACHE.popitem(last=False)
+    return ct
+
+def default_theme():
+    """CompiledTheme for theme.yaml, compiled on first use."""
+    ct = _LAZY.get("compiled")
+    if ct is None:
+        ct = _LAZY["compiled"] = compile_theme(_theme())
+    return ct
+
+def label(key, default): return default_theme().label(key, default)
+
+# Module-level names from before themes were compiled per call; resolved lazily on access.
+_LEGACY = {
+    "THEME": _theme, "DEFAULT": default_theme,
+    "BASE_FONT": lambda: default_theme().base_font, "BOLD_FONT": lambda: default_theme().bold_font,
+    "H1": lambda: default_theme().H1, "H2": lambda: default_theme().H2, "BODY": lambda: default_theme().BODY,
+    "META": lambda: default_theme().META, "BULLET": lambda: default_theme().BULLET,
+    "LABELS": lambda: default_theme().labels, "SECTION_ORDER": lambda: default_theme().section_order,
+}
+
+def __getattr__(name):
+    if name in _LEGACY: return _LEGACY[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ---------- RENDER HELPERS ----------
+def bullet_list(items, ct=None):
+    ct = ct or default_theme()
+    # ListFlowable wraps plain flowables itself; skipping ListItem saves one object per bullet.
+    return ListFlowable([Paragraph(i, ct.BULLET) for i in items], bulletType="bullet")
+
+def flowables(blocks, ct=None):
+    """ReportLab flowables for docmodel blocks (the PDF backend)."""
+    ct = ct or default_theme()
+    out = []
+    for b in blocks:
+        k = b.kind
+        if   k == "name":    out.append(Paragraph(b.text, ct.H1))
+        elif k == "contact": out.append(Paragraph(" &#8226; ".join(b.items), ct.META))
+        elif k == "heading": out.append(Paragraph(b.text, ct.H2))
+        elif k == "text":    out.append(Paragraph(b.text, ct.META if b.style == "meta" else ct.BODY))
+        elif k == "inline":
+            sep = ", " if b.style == "comma" else " &#8226; "
+            out.append(Paragraph(sep.join(b.items), ct.BODY))
+        elif k == "bullets": out.append(bullet_list(b.items, ct))
+        elif k == "row":
+            out.append(Table([[Paragraph(b.items[0], ct.BODY), Paragraph(b.items[1], ct.META)]],
+                             colWidths=ct.edu_cols, style=ct.EDU_TABLE))
+        elif k == "gap":     out.append(Spacer(1, b.size))
+    return out
+
+def _drawer(builder):
+    def draw(story, data, ct=None):
+        ct = ct or default_theme()
+        story.extend(flowables(builder(validate(data), ct.section_labels), ct))
+    draw.__name__ = "draw_" + builder.__name__[:-len("_blocks")]
+    return draw
+
+# Per-section entry points kept from before the document model; each appends one section.
+draw_header         = _drawer(docmodel.header_blocks)
+draw_summary        = _drawer(docmodel.summary_blocks)
+draw_skills         = _drawer(docmodel.skills_blocks)
+draw_experience     = _drawer(docmodel.experience_blocks)
+draw_education      = _drawer(docmodel.education_blocks)
+draw_certifications = _drawer(docmodel.certifications_blocks)
+
+class SectionCache:
+    """LRU of each section's flowables, keyed by (theme, page geometry, section, the data the
+    section reads), so unchanged sections are restored instead of rebuilt. Entries are stored
+    pickled: doc.build wraps and splits flowables in place, so every story needs its own copy,
+    and unpickling is several times cheaper than re-parsing Paragraph markup."""
+    def __init__(self, max_sections=256):
+        self.max_sections = max_sections
+        self.hits = self.misses = 0
+        self._blobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def flowables(self, spec, resume, ct):
+        raw = json.dumps(docmodel.section_values(spec, resume), sort_keys=True, default=str)
+        key = (ct.key, ct.page_size, ct.margins, spec.name, hashlib.sha1(raw.encode("utf-8")).hexdigest())
+        with self._lock:
+            blob = self._blobs.get(key)
+            if blob is not None:
+                self._blobs.move_to_end(key)
+                self.hits += 1
+        if blob is not None:
+            return pickle.loads(blob)
+        flows = flowables(spec.build(resume, ct.section_labels), ct)
+        blob = pickle.dumps(flows, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self.misses += 1
+            self._blobs[key] = blob
+            while len(self._blobs) > self.max_sections:
+                self._blobs.popitem(last=False)
+        return flows
+
+    def clear(self):
+        with self._lock: self._blobs.clear()
+
+def build_story(data, theme=None, cache=None):
+    """Flowables for one resume (or a prebuilt docmodel.Document), before any layout.
+    Runs the theme's section pipeline (see docmodel.register_section), skipping sections with
+    no data; raw dicts are validated first (see schema). With a SectionCache, unchanged
+    sections are restored from it."""
+    ct = compile_theme(theme)
     story = []
-    draw_header(story, data)
-    draw_summary(story, data)
-    draw_education(story, data)
-    draw_skills(story, data)
-    draw_experience(story, data)
-    draw_certifications(story, data)
-    doc.build(story)
+    if isinstance(data, docmodel.Document):
+        for sec in data.sections:
+            with stage("render.story." + sec.name):
+                story.extend(flowables(sec.blocks, ct))
+        return story
+    r = validate(data)
+    for spec in docmodel.pipeline(ct):
+        if spec.empty(r): continue
+        with stage("render.story." + spec.name):
+            story.extend(cache.flowables(spec, r, ct) if cache is not None
+                         else flowables(spec.build(r, ct.section_labels), ct))
+    return story
+
+def make_doc(target, data, page_size=None, margins=None, theme=None):
+    ct = compile_theme(theme).with_page(page_size, margins)
+    m = ct.margins
+    return SimpleDocTemplate(target, pagesize=ct.page_size,
+                             leftMargin=m[0], rightMargin=m[1],
+                             topMargin=m[2],  bottomMargin=m[3],
+                             title=data.get("name","Resume"))
+
+# ---------- AUTO-FIT ----------
+FIT_SIZE_KEYS = {"h1": 18, "h2": 12, "body": 10.5, "meta": 9.5, "leading_adjust": 2}
+
+def scale_theme(theme, scale):
+    """Copy of a theme dict with every size (and the leading adjust) multiplied by scale."""
+    theme = copy.deepcopy(compile_theme(theme).theme)
+    sizes = theme.setdefault("sizes", {})
+    for k, d in FIT_SIZE_KEYS.items():
+        sizes[k] = round(float(sizes.get(k, d)) * scale, 2)
+    return theme
+
+def estimate_pages(story, ct):
+    """Greedy page count from flowable wrap heights, without rendering any PDF.
+    Space before/after is summed (the frame collapses it) and flowables are moved
+    whole rather than split, so the estimate errs on the long side. Returns a fractional
+    fill: 1.5 means one full page plus half of a second."""
+    avail_w, avail_h = ct.frame_width, ct.frame_height
+    canv = Canvas(io.BytesIO(), pagesize=ct.page_size)  # only needed for string metrics
+    pages, y = 0, 0.0
+    for f in story:
+        h = f.wrapOn(canv, avail_w, avail_h)[1]
+        need = h + (f.getSpaceBefore() if y else 0)
+        if y and y + need > avail_h:
+            pages, y, need = pages + 1, 0.0, h
+        while need > avail_h:  # taller than a page: it will be split across pages
+            pages, need = pages + 1, need - avail_h
+        y += need + f.getSpaceAfter()
+    return pages + min(y, avail_h) / avail_h
+
+def fit_theme(data, theme=None, pages=1, page_size=None, margins=None,
+              min_scale=0.6, max_scale=1.0, tol=0.01):
+    """Largest size scale in [min_scale, max_scale] whose layout fits in `pages` pages.
+    Each probe only builds and wraps the story; the result's "theme" is ready to pass to
+    render_pdf and its "sizes" to save into theme.yaml."""
+    data = validate(data)
+    base = compile_theme(theme).with_page(page_size, margins)
+    def fill(scale):
+        ct = CompiledTheme(scale_theme(base, scale)).with_page(base.page_size, base.margins)
+        return estimate_pages(build_story(data, ct), ct)
+
+    lo, hi, probes = min_scale, max_scale, 0
+    f_hi = fill(hi); probes += 1
+    if f_hi <= pages:
+        lo = hi
+    else:
+        # Text height grows roughly with scale^2 (bigger glyphs, more wrapped lines); use that
+        # to bracket the answer tightly, then bisect.
+        guess = max(lo, min(hi, hi * (pages / f_hi) ** 0.5))
+        f_g = fill(guess); probes += 1
+        if f_g <= pages:
+            lo = guess
+            up = min(hi, guess * 1.05)
+            if fill(up) <= pages: lo = up
+            else: hi = up
+            probes += 1
+        else:
+            hi = guess
+            if fill(lo) > pages: hi = lo
+            probes += 1
+        while hi - lo > tol:
+            mid = (lo + hi) / 2
+            probes += 1
+            if fill(mid) <= pages: lo = mid
+            else: hi = mid
+    scale = round(lo, 3)
+    fitted = scale_theme(base, scale)
+    est = fill(scale)
+    return {"scale": scale, "sizes": fitted["sizes"], "estimated_pages": round(est, 3),
+            "fits": est <= pages, "probes": probes, "theme": fitted}
+
+def _build(target, data, page_size, margins, theme, fit_pages=None, cache=None):
+    laid_out = data if isinstance(data, docmodel.Document) else None
+    with stage("render.validate"):
+        data = laid_out.resume if laid_out else validate(data)  # fail before any layout work
+    if fit_pages:
+        with stage("render.fit"):
+            theme = fit_theme(data, theme, fit_pages, page_size, margins)["theme"]
+        laid_out = None  # sizes changed; sections are rebuilt for the fitted theme
+    with stage("render.theme"):
+        ct = compile_theme(theme).with_page(page_size, margins)
+    doc = make_doc(target, data, theme=ct)
+    story = build_story(laid_out or data, ct, None if fit_pages else cache)
+    metric("render.flowables", len(story))
+    with stage("render.build"):
+        doc.build(story)
+    metric("render.pages", doc.page)
+
+def render_pdf(data, out_path="output/resume.pdf", page_size=None, margins=None, theme=None, fit_pages=None,
+               cache=None):
+    """PUBLIC API used by app.py
+
+    data is a resume dict, a schema.Resume or a docmodel.Document (laid out for `theme`).
+    theme may be a theme dict, a theme.yaml path or a CompiledTheme (default: theme.yaml
+    loaded on first use). page_size ("LETTER"/"A4" or a (w, h) tuple) and margins
+    (left, right, top, bottom in points) override the theme when given. fit_pages=N
+    scales the theme's sizes down (see fit_theme) until the resume fits on N pages.
+    Malformed data raises schema.ValidationError before any layout. cache is an optional
+    SectionCache shared across renders."""
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    _build(out_path, data, page_size, margins, theme, fit_pages, cache)
+    if active(): metric("render.bytes", os.path.getsize(out_path))
     return out_path
+
+_BUFFERS = threading.local()
+
+def render_pdf_bytes(data, page_size=None, margins=None, theme=None, out_path=None, fit_pages=None, cache=None):
+    """Render into a reused per-thread in-memory buffer and return the PDF bytes.
+    When out_path is given the bytes are also written through to disk atomically."""
+    buf = getattr(_BUFFERS, "buf", None)
+    if buf is None:
+        buf = _BUFFERS.buf = io.BytesIO()
+    buf.seek(0); buf.truncate()
+    try:
+        _build(buf, data, page_size, margins, theme, fit_pages, cache)
+        pdf = buf.getvalue()
+        metric("render.bytes", len(pdf))
+    finally:
+        buf.seek(0); buf.truncate()
+    if out_path:
+        write_atomic(out_path, pdf)
+    return pdf
+
+def write_atomic(path, payload):
+    """Write bytes via a temp file + rename so concurrent writers never interleave."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.unlink(tmp)
+        raise
+    return path
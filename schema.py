@@ -0,0 +1,193 @@
+import datetime
+
+class ValidationError(ValueError):
+    """Resume data that does not match the schema; `errors` lists every (path, message) found."""
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = list(errors)
+
+    def __str__(self):
+        return "; ".join(f"{p}: {m}" for p, m in self.errors)
+
+# ---------- COERCERS ----------
+# Each takes (value, path, errors) and returns the normalized value, appending to errors
+# instead of raising so one pass reports everything wrong with a document.
+_SCALARS = (str, int, float, datetime.date)
+
+def _text(v, path, errors):
+    if v is None: return ""
+    if isinstance(v, str): return v
+    if isinstance(v, _SCALARS) and not isinstance(v, bool): return str(v)  # grad: 2015, dates: 2024-06-01
+    errors.append((path, f"expected text, got {type(v).__name__}"))
+    return ""
+
+def _text_list(v, path, errors):
+    if v is None: return []
+    if not isinstance(v, list):
+        errors.append((path, f"expected a list, got {type(v).__name__}"))
+        return []
+    out = []
+    for i, item in enumerate(v):
+        s = _text(item, f"{path}[{i}]", errors)
+        if s: out.append(s)
+    return out
+
+def _records(cls):
+    def coerce(v, path, errors):
+        if v is None: return []
+        if not isinstance(v, list):
+            errors.append((path, f"expected a list, got {type(v).__name__}"))
+            return []
+        return [cls.from_dict(item, f"{path}[{i}]", errors) for i, item in enumerate(v)]
+    return coerce
+
+# ---------- RECORDS ----------
+class Record:
+    """Base for the schema records: a fixed set of slots filled from a dict, where each field
+    names the keys (canonical first, then aliases) it may be read from. FIELDS is compiled
+    into a flat (slot, keys, coerce) tuple once per class."""
+    __slots__ = ()
+    FIELDS = ()
+    EXTRA = False  # keep unknown keys in `extra` instead of dropping them
+
+    def __init_subclass__(cls):
+        cls._spec = tuple((f[0], f[1], f[2]) for f in cls.FIELDS)
+        cls._known = frozenset(k for _, keys, _ in cls._spec for k in keys)
+
+    @classmethod
+    def from_dict(cls, d, path="", errors=None):
+        raise_now = errors is None
+        if raise_now: errors = []
+        self = cls.__new__(cls)
+        if not isinstance(d, dict):
+            errors.append((path or "<root>", f"expected a mapping, got {type(d).__name__}"))
+            d = {}
+        pre = path + "." if path else ""
+        for slot, keys, coerce in cls._spec:
+            v = None
+            for k in keys:
+                v = d.get(k)
+                if v is not None and v != "": break
+            setattr(self, slot, coerce(v, pre + keys[0], errors))
+        if cls.EXTRA:
+            extra = cls.EXTRA_FIELDS
+            self.extra = {k: (extra[k](v, pre + k, errors) if k in extra else v)
+                          for k, v in d.items() if k not in cls._known}
+        if raise_now and errors: raise ValidationError(errors)
+        return self
+
+    def get(self, key, default=None):
+        """dict-style read, so the draw_* functions take records and plain dicts alike."""
+        v = getattr(self, key, None)
+        if v is None and self.EXTRA: v = self.extra.get(key)
+        return default if v is None else v
+
+    def to_dict(self):
+        out = {}
+        for slot, _, _ in self._spec:
+            v = getattr(self, slot)
+            out[slot] = to_plain(v)
+        if self.EXTRA: out.update((k, to_plain(v)) for k, v in self.extra.items())
+        return out
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+def to_plain(v):
+    """Lists of records as lists of dicts; anything else unchanged."""
+    if isinstance(v, list): return [x.to_dict() if isinstance(x, Record) else x for x in v]
+    return v
+
+class Job(Record):
+    __slots__ = ("company", "role", "dates", "location", "bullets")
+    FIELDS = (
+        ("company",  ("company", "organization", "employer"), _text),
+        ("role",     ("role", "title", "position"),           _text),
+        ("dates",    ("dates",),                              _text),
+        ("location", ("location",),                           _text),
+        ("bullets",  ("bullets",),                            _text_list),
+    )
+
+class Education(Record):
+    __slots__ = ("school", "grad", "location", "degree")
+    FIELDS = (
+        ("school",   ("school", "institution"), _text),
+        ("grad",     ("grad", "dates"),         _text),
+        ("location", ("location",),             _text),
+        ("degree",   ("degree",),               _text),
+    )
+
+class Resume(Record):
+    __slots__ = ("name", "title", "email", "phone", "location", "links", "summary",
+                 "education", "skills", "experience", "certifications", "extra")
+    FIELDS = (
+        ("name",           ("name",),           _text),
+        ("title",          ("title",),          _text),
+        ("email",          ("email",),          _text),
+        ("phone",          ("phone",),          _text),
+        ("location",       ("location",),       _text),
+        ("links",          ("links",),          _text_list),
+        ("summary",        ("summary",),        _text),
+        ("education",      ("education",),      _records(Education)),
+        ("skills",         ("skills",),         _text_list),
+        ("experience",     ("experience",),     _records(Job)),
+        ("certifications", ("certifications",), _text_list),
+    )
+    EXTRA = True
+    EXTRA_FIELDS = {}  # extra key -> coercer, see register_field
+
+class Entry(Record):
+    """One item of a custom section (a project, publication, award, ...)."""
+    __slots__ = ("title", "subtitle", "dates", "location", "link", "description", "bullets")
+    FIELDS = (
+        ("title",       ("title", "name"),                         _text),
+        ("subtitle",    ("subtitle", "role", "publisher", "venue"), _text),
+        ("dates",       ("dates", "date", "year"),                 _text),
+        ("location",    ("location",),                             _text),
+        ("link",        ("link", "url"),                           _text),
+        ("description", ("description", "summary"),                _text),
+        ("bullets",     ("bullets",),                              _text_list),
+    )
+
+def _entries(v, path, errors):
+    # A bare string stands for an entry with just a title (e.g. a list of publication citations).
+    if isinstance(v, list):
+        v = [{"title": x} if isinstance(x, str) else x for x in v]
+    return _records(Entry)(v, path, errors)
+
+COERCERS = {"text": _text, "list": _text_list, "entries": _entries}
+
+def register_field(key, kind):
+    """Validate the top-level `key` (kept in Resume.extra) as "text", "list" or "entries"
+    (or with a coerce(value, path, errors) function)."""
+    if key in Resume._known:
+        raise ValueError(f"{key!r} is a built-in resume field")
+    Resume.EXTRA_FIELDS[key] = COERCERS[kind] if isinstance(kind, str) else kind
+
+# Optional sections with a renderer in docmodel; not in the default section_order.
+register_field("projects", "entries")
+register_field("publications", "entries")
+
+# ---------- API ----------
+def check(data):
+    """(Resume, errors) without raising; errors is a list of (path, message)."""
+    if isinstance(data, Resume): return data, []
+    errors = []
+    return Resume.from_dict(data, "", errors), errors
+
+def validate(data):
+    """Normalized Resume for a raw dict (aliases folded, scalars stringified, None dropped).
+    Raises ValidationError listing every problem; a Resume is returned unchanged."""
+    resume, errors = check(data)
+    if errors: raise ValidationError(errors)
+    return resume
+
+def load_yaml(path):
+    """yaml.safe_load with the libyaml loader when it is available (several times faster)."""
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=loader)
@@ -0,0 +1,83 @@
+import re
+
+# ---------- HEADINGS ----------
+# Canonical section -> heading phrases (lowercase, "&" written as "and").
+DEFAULT_HEADINGS = {
+    "summary": ["summary", "profile", "objective", "career objective", "about me", "overview"],
+    "experience": ["experience", "experiences", "work history", "employment", "employment history",
+                   "career history", "professional background"],
+    "education": ["education", "academic background", "academics", "education and training"],
+    "skills": ["skills", "skill", "competencies", "core competencies", "technologies", "proficiencies",
+               "skills and software proficiencies", "skills and tools", "tools and technologies"],
+    "certifications": ["certifications", "certificates", "licenses and certifications", "certifications and licenses"],
+}
+# Qualifiers that may precede any heading, any number of times ("Professional Experience",
+# "Relevant Professional Experience", "Technical Skills", ...).
+HEADING_PREFIXES = ["professional", "relevant", "work", "technical", "key", "core", "selected", "career"]
+MAX_HEADING_LEN = 60
+
+def _norm(line):
+    return " ".join(line.lower().replace("&", " and ").split())
+
+def _phrase(p):
+    # "skills and tools" -> skills\s*(?:and|&)\s*tools, tolerant of spacing and "&"
+    return r"\s*".join(r"(?:and|&)" if w == "and" else re.escape(w) for w in p.split())
+
+class SectionClassifier:
+    """Single-pass heading detector: one precompiled case-insensitive pattern, one fullmatch per
+    short line. A heading may carry its first content inline ("Technical Skills: Python, SQL")."""
+    def __init__(self, headings=None, prefixes=None):
+        merged = {k: list(v) for k, v in DEFAULT_HEADINGS.items()}
+        for sec, words in (headings or {}).items():
+            merged.setdefault(sec, []).extend(_norm(w) for w in words)
+        self.sections = tuple(merged)
+        groups = []
+        for i, sec in enumerate(self.sections):
+            alts = sorted({w for w in merged[sec] if w}, key=len, reverse=True)
+            if alts: groups.append(f"(?P<s{i}>{'|'.join(_phrase(a) for a in alts)})")
+        pre = "|".join(re.escape(p) for p in (HEADING_PREFIXES if prefixes is None else prefixes))
+        body = (f"(?:(?:{pre})\\s+)*" if pre else "") + f"(?:{'|'.join(groups)})"
+        self._rx = re.compile(f"[\\W_]*{body}(?:[\\W_]*|\\s*:\\s*(?P<rest>.*))", re.IGNORECASE)
+
+    def heading(self, line):
+        """(section, inline content or "") for a heading line, or None for body text."""
+        if len(line) > MAX_HEADING_LEN and ":" not in line[:MAX_HEADING_LEN]: return None
+        m = self._rx.fullmatch(line)
+        if m is None: return None
+        sec = next(k for k, v in m.groupdict().items() if v is not None and k != "rest")
+        return self.sections[int(sec[1:])], (m.group("rest") or "").strip()
+
+    def classify(self, line):
+        """Return the section a heading line opens, or None for body text."""
+        h = self.heading(line)
+        return h[0] if h else None
+
+    def split(self, lines, start="summary"):
+        """Bucket lines under the most recent heading; heading text itself is dropped, inline
+        content after "Heading:" is kept. Lines before the first heading go under `start`,
+        which need not be a section."""
+        out = {s: [] for s in self.sections}
+        current = out.setdefault(start, [])
+        for ln in lines:
+            h = self.heading(ln)
+            if h is None:
+                current.append(ln)
+                continue
+            current = out[h[0]]
+            if h[1]: current.append(h[1])
+        return out
+
+_DEFAULT = None
+
+def default_classifier():
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = SectionClassifier()
+    return _DEFAULT
+
+# ---------- FIELD HELPERS ----------
+def split_skills(lines, limit=30):
+    toks = []
+    for s in lines:
+        toks.extend(t.strip() for t in re.split(r"[,;|•]", s) if t.strip())
+    return toks[:limit]
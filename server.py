@@ -0,0 +1,257 @@
+import argparse, asyncio, io, json, os, re, time, zipfile
+from concurrent.futures import ProcessPoolExecutor
+from aiohttp import web
+
+# ---------- WORKERS ----------
+def _init_worker(preload=()):
+    # Compile the default theme (fonts, styles) and parse the preloaded themes' TTFs once per
+    # worker so they stay warm; a no-op under fork, where start() already did both.
+    from fonts import preload as preload_fonts
+    from resume_template import default_theme
+    default_theme()
+    preload_fonts(*preload)
+
+def _ping():
+    return os.getpid()
+
+def _render(data, theme, fmt="pdf"):
+    if fmt == "pdf":
+        from resume_template import render_pdf_bytes
+        return render_pdf_bytes(data, theme=theme)
+    from docmodel import build_document, render
+    return render(build_document(data, theme), fmt)
+
+class Busy(Exception):
+    pass
+
+class RenderService:
+    """Process pool behind a bounded admission queue with per-render timeouts."""
+    def __init__(self, workers=None, max_queue=64, timeout=30.0, preload=()):
+        self.workers = workers or os.cpu_count() or 1
+        self.preload = tuple(preload)  # theme dicts whose fonts are parsed before the pool starts
+        self.max_pending = self.workers + max_queue
+        self.timeout = timeout
+        self.pending = 0
+        self.pool = None
+        self._capacity = None
+
+    async def start(self):
+        _init_worker(self.preload)  # parse theme fonts once here; forked workers share them
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=(self.preload,))
+        self._capacity = asyncio.Semaphore(self.max_pending)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ping) for _ in range(self.workers)))
+
+    async def stop(self):
+        if self.pool: self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def render(self, data, theme=None, wait=False, fmt="pdf"):
+        """Render on the pool. Raises Busy when the queue is full (unless wait=True) and
+        asyncio.TimeoutError after `timeout` seconds. A slot is held until the worker is
+        actually done, so timed-out renders still count against the queue."""
+        if not wait and self._capacity.locked(): raise Busy()
+        await self._capacity.acquire()
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        try:
+            cf = self.pool.submit(_render, data, theme, fmt)
+        except BaseException:
+            self._release(); raise
+        cf.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(cf)), self.timeout)
+
+    def _release(self):
+        self.pending -= 1
+        self._capacity.release()
+
+# ---------- HTTP ----------
+MAX_BATCH = 1000
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "html": "text/html; charset=utf-8",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain; charset=utf-8",
+}
+
+def _filename(name, i, fmt="pdf"):
+    stem = re.sub(r"[^\w.-]+", "_", (name or "").strip()).strip("._") or f"resume_{i}"
+    return stem if stem.lower().endswith("." + fmt) else f"{stem}.{fmt}"
+
+TTF_KEYS = {"ttf_regular": "Inter-Regular.ttf", "ttf_bold": "Inter-Bold.ttf"}  # defaults as in FontStore.resolve
+
+def request_theme(theme, font_dir=None):
+    """A client-supplied theme, checked before it reaches the renderer: it must be an object
+    (a string would be read as a server path), and its TTF files must be bare file names,
+    resolved inside font_dir. Without font_dir, prefer_ttf themes are refused. Raises ValueError."""
+    if theme is None: return None
+    if not isinstance(theme, dict):
+        raise ValueError("'theme' must be an object")
+    fonts = theme.get("fonts")
+    if fonts is None: return theme
+    if not isinstance(fonts, dict):
+        raise ValueError("'theme.fonts' must be an object")
+    fonts = dict(fonts)
+    for k, default in TTF_KEYS.items():
+        v = fonts.get(k, default if fonts.get("prefer_ttf") else None)
+        if v is None: continue
+        if not isinstance(v, str) or not v or os.path.basename(v) != v or v.startswith("."):
+            raise ValueError(f"'theme.fonts.{k}' must be a font file name")
+        if font_dir: fonts[k] = os.path.join(font_dir, v)
+    if fonts.get("prefer_ttf") and not font_dir:
+        raise ValueError("custom TTF fonts are not enabled on this server")
+    return dict(theme, fonts=fonts)
+
+def _error(e):
+    """Client-facing text for a failed render; font errors name server paths, so they stay generic."""
+    from fonts import FontError
+    if isinstance(e, FontError): return "FontError: a theme font could not be loaded"
+    return f"{type(e).__name__}: {e}"
+
+async def _json(request):
+    try:
+        body = await request.json()
+    except (ValueError, UnicodeDecodeError):
+        raise web.HTTPBadRequest(text="body must be JSON")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text="body must be a JSON object")
+    return body
+
+async def handle_render(request):
+    """POST {"data": {...}, "theme": {...}?, "format": "pdf"|"html"|"docx"|"txt"?} -> the document"""
+    svc = request.app["service"]
+    body = await _json(request)
+    data = body.get("data", body)
+    if not isinstance(data, dict):
+        raise web.HTTPBadRequest(text="'data' must be an object")
+    fmt = body.get("format", "pdf") if "data" in body else "pdf"
+    if fmt not in CONTENT_TYPES:
+        raise web.HTTPBadRequest(text=f"'format' must be one of {', '.join(CONTENT_TYPES)}")
+    try:
+        theme = request_theme(body.get("theme"), request.app["font_dir"])
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=str(e))
+    try:
+        out = await svc.render(data, theme, fmt=fmt)
+    except Busy:
+        raise web.HTTPServiceUnavailable(text="render queue full", headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise web.HTTPGatewayTimeout(text=f"render exceeded {svc.timeout}s")
+    except Exception as e:
+        raise web.HTTPUnprocessableEntity(text=_error(e))
+    name = _filename(body.get("filename") or data.get("name"), 0, fmt)
+    return web.Response(body=out, headers={"Content-Type": CONTENT_TYPES[fmt],
+                                           "Content-Disposition": f'attachment; filename="{name}"'})
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, non-seekable sink so zipfile streams entries instead of seeking back."""
+    def __init__(self):
+        self.chunks, self.pos = [], 0
+    def writable(self): return True
+    def write(self, b):
+        self.chunks.append(bytes(b)); self.pos += len(b)
+        return len(b)
+    def tell(self): return self.pos
+    def drain(self):
+        out = b"".join(self.chunks); self.chunks.clear()
+        return out
+
+async def handle_batch(request):
+    """POST {"items": [{"data": {...}, "theme"?, "filename"?}, ...], "theme"?} -> streamed ZIP.
+    Items are admitted as queue slots free up; failures are listed in errors.json."""
+    svc = request.app["service"]
+    body = await _json(request)
+    items = body.get("items")
+    if not isinstance(items, list) or not items:
+        raise web.HTTPBadRequest(text="'items' must be a non-empty list")
+    if len(items) > MAX_BATCH:
+        raise web.HTTPRequestEntityTooLarge(max_size=MAX_BATCH, actual_size=len(items))
+    font_dir = request.app["font_dir"]
+    try:
+        default_theme = request_theme(body.get("theme"), font_dir)
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=str(e))
+
+    async def one(i, item):
+        data = item.get("data", item) if isinstance(item, dict) else None
+        if not isinstance(data, dict):
+            return i, None, None, "item must be an object"
+        name = _filename(item.get("filename") or data.get("name"), i)
+        try:
+            theme = request_theme(item["theme"], font_dir) if "theme" in item else default_theme
+        except ValueError as e:
+            return i, name, None, str(e)
+        try:
+            return i, name, await svc.render(data, theme, wait=True), None
+        except asyncio.TimeoutError:
+            return i, name, None, f"render exceeded {svc.timeout}s"
+        except Exception as e:
+            return i, name, None, _error(e)
+
+    resp = web.StreamResponse(headers={"Content-Type": "application/zip",
+                                       "Content-Disposition": 'attachment; filename="resumes.zip"'})
+    await resp.prepare(request)
+    sink, used, errors = _ZipSink(), set(), []
+    tasks = [asyncio.ensure_future(one(i, it)) for i, it in enumerate(items)]
+    try:
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zf:
+            for fut in asyncio.as_completed(tasks):
+                i, name, pdf, err = await fut
+                if err:
+                    errors.append({"index": i, "filename": name, "error": err})
+                    continue
+                if name in used: name = f"{name[:-4]}_{i}.pdf"
+                used.add(name)
+                zf.writestr(zipfile.ZipInfo(name, time.localtime()[:6]), pdf)
+                await resp.write(sink.drain())
+            if errors:
+                zf.writestr("errors.json", json.dumps(sorted(errors, key=lambda e: e["index"]), indent=2))
+        await resp.write(sink.drain())
+    finally:
+        for t in tasks: t.cancel()
+    await resp.write_eof()
+    return resp
+
+async def handle_health(request):
+    svc = request.app["service"]
+    return web.json_response({"workers": svc.workers, "pending": svc.pending, "max_pending": svc.max_pending})
+
+def make_app(workers=None, max_queue=64, timeout=30.0, font_dir=None, preload_themes=()):
+    """preload_themes are theme.yaml paths (checked like request themes) whose fonts every
+    worker starts with, so brand themes sent per request never parse TTFs on the hot path."""
+    from docmodel import load_theme
+    app = web.Application(client_max_size=32 << 20)
+    app["font_dir"] = font_dir = os.path.abspath(font_dir) if font_dir else None
+    preload = [request_theme(load_theme(p), font_dir) for p in preload_themes]
+    svc = app["service"] = RenderService(workers, max_queue, timeout, preload)
+    async def _startup(app): await svc.start()
+    async def _cleanup(app): await svc.stop()
+    app.on_startup.append(_startup)
+    app.on_cleanup.append(_cleanup)
+    app.router.add_post("/render", handle_render)
+    app.router.add_post("/render/batch", handle_batch)
+    app.router.add_get("/healthz", handle_health)
+    return app
+
+def main():
+    ap = argparse.ArgumentParser(description="HTTP service rendering resume JSON to PDF")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("-j","--workers", type=int, default=None, help="Render processes (default: CPU count)")
+    ap.add_argument("--queue", type=int, default=64, help="Requests allowed to wait for a worker before 503 (default: 64)")
+    ap.add_argument("--timeout", type=float, default=30.0, help="Per-render timeout in seconds (default: 30)")
+    ap.add_argument("--font-dir", default=None,
+                    help="Directory request themes may load TTFs from by file name (default: TTF themes refused)")
+    ap.add_argument("--preload-theme", action="append", default=[], metavar="THEME_YAML",
+                    help="Parse this theme's fonts before the workers fork (repeatable; brand themes clients send)")
+    args = ap.parse_args()
+    missing = [p for p in args.preload_theme if not os.path.isfile(p)]
+    if missing: ap.error(f"theme file not found: {', '.join(missing)}")
+    try:
+        app = make_app(args.workers, args.queue, args.timeout, args.font_dir, args.preload_theme)
+    except ValueError as e:
+        ap.error(f"--preload-theme: {e}")
+    web.run_app(app, host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
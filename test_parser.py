@@ -0,0 +1,127 @@
+import io, zipfile
+import pytest
+from parser import education_entries, parse, parse_docx, parse_txt, split_header
+from sections import default_classifier
+
+def _txt(text):
+    return text.strip().encode("utf-8")
+
+def _docx(text):
+    from docx import Document
+    doc = Document()
+    for line in text.strip().splitlines():
+        doc.add_paragraph(line.strip())
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+CLEAN = """
+Jordan Avery
+jordan.avery@email.com | (555) 123-4567 | Dallas, TX
+Integrations engineer with eight years of partner onboarding and API platform work.
+Relevant Professional Experience
+Senior Engineer - Coca-Cola
+Jan 2019 - Present
+- Shipped the partner API used by forty distributors across the region.
+- Cut onboarding time from six weeks to nine days.
+Jan 2015 - Dec 2018
+Support Engineer | Wal-Mart
+- Owned the integrations queue for the retail analytics team.
+Education
+State University, Memphis, TN, 2015
+B.S. Information Systems
+Technical Skills: Python, SQL, Docker
+"""
+
+FOOTER_CONTACT = """
+Jordan Avery
+Integrations engineer with eight years of partner onboarding and API platform work.
+Experience
+Senior Engineer - Coca-Cola
+Jan 2019 - Present
+- Shipped the partner API used by forty distributors across the region.
+Skills
+Python, SQL
+jordan.avery@email.com | (555) 123-4567
+"""
+
+UNSTRUCTURED = """
+Jordan Avery
+Experience
+Acme Corp
+Senior Engineer
+Jan 2019 - Present
+Dallas, TX
+- Shipped the partner API used by forty distributors across the region.
+Contact: jordan.avery@email.com
+"""
+
+# ---------- HELPERS ----------
+def test_split_header_keeps_hyphenated_names():
+    assert split_header("Senior Engineer - Coca-Cola") == ("Senior Engineer", "Coca-Cola")
+    assert split_header("Analyst — Wal-Mart") == ("Analyst", "Wal-Mart")
+    assert split_header("Coca-Cola") == ("Coca-Cola", "")
+
+def test_education_location_is_taken_from_the_end_of_the_line():
+    assert education_entries(["State University, Memphis, TN, 2015", "B.S. Information Systems"]) == [
+        {"school": "State University", "grad": "2015", "location": "Memphis, TN", "degree": "B.S. Information Systems"}]
+    assert education_entries(["University of Memphis", "Memphis, TN", "2015"]) == [
+        {"school": "University of Memphis", "grad": "2015", "location": "Memphis, TN", "degree": ""}]
+
+@pytest.mark.parametrize("line, expected", [
+    ("Relevant Professional Experience", ("experience", "")),
+    ("Technical Skills: Python, SQL", ("skills", "Python, SQL")),
+    ("EDUCATION", ("education", "")),
+    ("Led the experience redesign for partners", None),
+])
+def test_headings(line, expected):
+    assert default_classifier().heading(line) == expected
+
+# ---------- FAST PARSE ----------
+@pytest.mark.parametrize("kind, fast", [("txt", parse_txt), ("docx", parse_docx)])
+def test_clean_resume_stays_on_the_fast_path(kind, fast):
+    raw = (_txt if kind == "txt" else _docx)(CLEAN)
+    data = fast(raw)
+    assert [(j["role"], j["company"], j["dates"]) for j in data["experience"]] == [
+        ("Senior Engineer", "Coca-Cola", "Jan 2019 - Present"),
+        ("Support Engineer", "Wal-Mart", "Jan 2015 - Dec 2018"),
+    ]
+    assert len(data["experience"][0]["bullets"]) == 2
+    assert data["skills"] == ["Python", "SQL", "Docker"]
+    assert data["email"] == "jordan.avery@email.com" and data["phone"] == "(555) 123-4567"
+    assert data["education"][0]["location"] == "Memphis, TN"
+    assert data["summary"].startswith("Integrations engineer")
+    assert parse(raw, kind)["confidence"]["strategy"] == "fast"
+
+def test_docx_main_part_comes_from_the_package_relationships():
+    src = zipfile.ZipFile(io.BytesIO(_docx(CLEAN)))
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as dst:
+        for item in src.infolist():
+            raw = src.read(item)
+            if item.filename == "_rels/.rels": raw = raw.replace(b"word/document.xml", b"word/document2.xml")
+            dst.writestr(item.filename.replace("word/document.xml", "word/document2.xml"), raw)
+    assert parse_docx(buf.getvalue())["name"] == "Jordan Avery"
+
+def test_date_lines_are_not_job_headers():
+    data = parse_docx(_docx(CLEAN))
+    assert all(not j["role"].startswith("Jan") for j in data["experience"])
+
+# ---------- ESCALATION ----------
+@pytest.mark.parametrize("kind, fast", [("txt", parse_txt), ("docx", parse_docx)])
+def test_footer_contact_escalates(kind, fast):
+    raw = (_txt if kind == "txt" else _docx)(FOOTER_CONTACT)
+    assert "email" not in fast(raw)
+    data = parse(raw, kind)
+    assert data["confidence"]["strategy"] == "thorough"
+    assert data["email"] == "jordan.avery@email.com" and data["phone"] == "(555) 123-4567"
+    assert data["skills"] == ["Python", "SQL"]
+
+def test_unstructured_jobs_escalate():
+    raw = _txt(UNSTRUCTURED)
+    assert parse_txt(raw)["confidence"]["fields"]["experience"] < 0.6
+    data = parse(raw, "txt")
+    assert data["confidence"]["strategy"] == "thorough"
+    job, = data["experience"]
+    assert (job["company"], job["role"], job["dates"], job["location"]) == (
+        "Acme Corp", "Senior Engineer", "Jan 2019 - Present", "Dallas, TX")